@@ -1,18 +1,28 @@
 
 
-from flask import Flask, render_template, request, jsonify, Response
+from flask import Flask, render_template, request, jsonify, Response, send_file
 from flask_cors import CORS
 from database import Database
 from account_manager import AccountManager
-from scraper import InstagramScraper
+from driver_pool import DriverPool
 from config import Config
 from data_formatter import DataFormatter
-import threading
+from export_stream import (
+    attachment_name, encode_chunks, export_response, gzip_chunks, iter_json_array, iter_ndjson
+)
+import parquet_export
 import os
-import json
+import tempfile
+import zipfile
+import atexit
 from functools import wraps
 from datetime import datetime
-from task_handler import handle_task
+from task_queue import TaskQueue
+from task_handler import RESUMABLE_TASK_TYPES
+from insta_scraper import client_cache
+from profile_cache import profile_cache
+from row_cache import RowCache
+from http_client import http_metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -21,9 +31,19 @@ CORS(app)
 # Initialize components
 db = Database()
 account_manager = AccountManager()
+row_cache = RowCache(db)
+driver_pool = DriverPool()
+if Config.PROFILE_CACHE_PERSIST:
+    profile_cache.use_database(db)
 
-# Active scrapers
-active_scrapers = {}
+# Items read from the database per page when streaming exports
+EXPORT_PAGE_SIZE = 1000
+
+# Rows per /data/table page (default and cap) and the filters it accepts
+TABLE_PAGE_SIZE = 100
+TABLE_MAX_PAGE_SIZE = 1000
+TABLE_FLAG_FILTERS = ('is_private', 'is_verified')
+TABLE_TEXT_FILTERS = ('username', 'full_name', 'biography')
 
 # Simple API key authentication
 def require_api_key(f):
@@ -66,95 +86,58 @@ def load_accounts_from_env():
     print(f"✨ Account loading complete!")
 
 
-def process_task(task_id):
-    """Process a scraping task in background"""
-    scraper = None
-    account = None
-    
-    try:
-        # Get task details
-        tasks = db.get_tasks()
-        task = next((t for t in tasks if t['id'] == task_id), None)
-        
-        if not task:
-            raise Exception(f"Task {task_id} not found")
+# Task types only the Selenium scraper handles; the queue runs them here
+BROWSER_TASK_TYPES = ('posts', 'hashtag', 'following')
 
-        max_items = task.get('max_items', 10000)
 
-        # Get available account
-        account = db.get_available_account()
-        if not account:
-            raise Exception("No available accounts")
-        
-        # Update task status
-        db.update_task_status(task_id, 'running')
-        
-        # Initialize scraper
-        scraper = InstagramScraper()
-        print('inti')
-        scraper.init_driver()
-        
-        # Login
-        print('logging in')
-        if not scraper.login(account['username'], account['password']):
-            raise Exception("Login failed")
-        
-        # Execute task based on type
-        result = None
-        
-        if task['task_type'] == 'profile':
-            result = scraper.scrape_profile(task['target'])
-            db.save_scraped_data(task_id, 'profile', result)
-            
-        elif task['task_type'] == 'posts':
-            result = scraper.scrape_posts(task['target'], max_posts=max_items)
-            db.save_scraped_data(task_id, 'posts', result)
-            
-        elif task['task_type'] == 'hashtag':
-            result = scraper.scrape_hashtag(task['target'], max_posts=max_items)
-            db.save_scraped_data(task_id, 'hashtag', result)
-            
-        elif task['task_type'] == 'followers':
-            result = scraper.scrape_followers(task['target'], max_followers=max_items)
-            db.save_scraped_data(task_id, 'followers', result)
-            
-        elif task['task_type'] == 'following':
-            result = scraper.scrape_following(task['target'], max_following=max_items)
-            db.save_scraped_data(task_id, 'following', result)
-            
-        # NEW: Comments scraping
-        elif task['task_type'] == 'comments':
-            result = scraper.scrape_post_comments(task['target'], max_comments=max_items)
-            db.save_scraped_data(task_id, 'comments', result)
-            
-        # NEW: Likes scraping
-        elif task['task_type'] == 'likes':
-            result = scraper.scrape_post_likes(task['target'], max_likes=max_items)
-            db.save_scraped_data(task_id, 'likes', result)
-        
-        # Calculate result count
-        result_count = 1 if isinstance(result, dict) else len(result) if isinstance(result, list) else 0
-        
-        # Mark task complete
-        db.update_task_status(
-            task_id,
-            'completed',
-            result=f"Successfully scraped {result_count} item(s) from {task['target']}"
-        )
-        
-        db.increment_account_tasks(account['id'])
-        print(f"✅ Task {task_id} completed - {result_count} items scraped")
-        
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Task {task_id} failed: {error_msg}")
-        db.update_task_status(task_id, 'failed', error_message=error_msg)
-        
-    finally:
-        if scraper:
-            scraper.close()
-        if task_id in active_scrapers:
-            del active_scrapers[task_id]
+def run_browser_task(task, account):
+    """Run a browser-only task with a pooled driver for the leased account.
+
+    Called by the task queue, which claimed the task, owns the account lease
+    and marks the task failed if this raises.
+    """
+    task_id = task['id']
+    max_items = task.get('max_items') or 10000
+
+    # Borrow a warm, logged-in browser for this account
+    with driver_pool.acquire(account['username'], account['password']) as scraper:
+        scraper.set_pacing(account.get('pacing_floor'))
+        scraper.reset_page_metrics()
+        try:
+            # Execute task based on type
+            if task['task_type'] == 'posts':
+                result = scraper.scrape_posts(task['target'], max_posts=max_items)
+            elif task['task_type'] == 'hashtag':
+                result = scraper.scrape_hashtag(task['target'], max_posts=max_items)
+            elif task['task_type'] == 'following':
+                result = scraper.scrape_following(task['target'], max_following=max_items)
+            else:
+                raise ValueError(f"Invalid task type: {task['task_type']}")
+            db.save_scraped_data(task_id, task['task_type'], result)
+        finally:
+            # Bandwidth and page-load time for this task only
+            scraper.record_page_metrics()
+            db.update_task_metrics(task_id, scraper.page_metrics)
+
+    # Calculate result count
+    result_count = 1 if isinstance(result, dict) else len(result) if isinstance(result, list) else 0
+
+    # Mark task complete
+    db.update_task_status(
+        task_id,
+        'completed',
+        result=f"Successfully scraped {result_count} item(s) from {task['target']}",
+        item_count=result_count
+    )
+
+    db.increment_account_tasks(account['id'])
+    print(f"✅ Task {task_id} completed - {result_count} items scraped")
+
+
+task_queue = TaskQueue(
+    db, row_cache=row_cache,
+    handlers={task_type: run_browser_task for task_type in BROWSER_TASK_TYPES}
+)
 
 @app.route('/')
 def index():
@@ -168,12 +151,16 @@ def manage_accounts():
         data = request.json
         username = data.get('username')
         password = data.get('password')
+        pacing_floor = data.get('pacing_floor')
         
         if not username or not password:
             return jsonify({'error': 'Username and password required'}), 400
             
         try:
-            account_id = db.add_account(username, password)
+            account_id = db.add_account(
+                username, password,
+                pacing_floor=float(pacing_floor) if pacing_floor is not None else None
+            )
             return jsonify({'success': True, 'account_id': account_id})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -185,6 +172,19 @@ def manage_accounts():
             acc['password'] = '********'
         return jsonify(accounts)
 
+@app.route('/api/accounts/<int:account_id>/pacing', methods=['PUT'])
+def set_account_pacing(account_id):
+    """Set an account's minimum seconds between page actions (null = default)"""
+    pacing_floor = (request.json or {}).get('pacing_floor')
+    try:
+        if pacing_floor is not None:
+            pacing_floor = float(pacing_floor)
+        if not db.set_account_pacing(account_id, pacing_floor):
+            return jsonify({'error': 'Account not found'}), 404
+        return jsonify({'success': True, 'pacing_floor': pacing_floor})
+    except (TypeError, ValueError):
+        return jsonify({'error': 'pacing_floor must be a number'}), 400
+
 
 @app.route('/api/tasks', methods=['GET', 'POST'])
 def manage_tasks():
@@ -207,21 +207,15 @@ def manage_tasks():
             }), 400
         
         try:
-            # Create task
-            task_id = db.create_task(task_type, target)
-            
-            # Start task in background
-            thread = threading.Thread(target=handle_task, args=(db, task_id, task_type, target, task_data_id, max_items))
-            thread.daemon = True
-            thread.start()
-            print(f'Task #{task_id} started. Type : {task_type}')
-            
-            active_scrapers[task_id] = thread
+            # Queue task; a worker from the pool picks it up
+            task_id = db.create_task(task_type, target, max_items=max_items, task_data_id=task_data_id)
+            task_queue.notify()
+            print(f'Task #{task_id} queued. Type : {task_type}')
             
             return jsonify({
                 'success': True, 
                 'task_id': task_id,
-                'message': f'Task #{task_id} created. Scraping up to {max_items} items from {target}'
+                'message': f'Task #{task_id} queued. Scraping up to {max_items} items from {target}'
             })
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -236,8 +230,7 @@ def manage_tasks():
 def get_task(task_id):
     """Get specific task details"""
     try:
-        tasks = db.get_tasks()
-        task = next((t for t in tasks if t['id'] == task_id), None)
+        task = db.get_task(task_id)
         
         if not task:
             return jsonify({'error': 'Task not found'}), 404
@@ -248,8 +241,18 @@ def get_task(task_id):
 
 @app.route('/api/tasks/<int:task_id>/data')
 def get_task_data(task_id):
-    """Get scraped data for a task (raw JSON format)"""
+    """Get scraped data for a task (raw JSON format)
+
+    Passing ``limit`` (and optionally ``after``) returns a single page of
+    items instead of the full records.
+    """
     try:
+        if 'limit' in request.args:
+            limit = max(1, min(request.args.get('limit', 50, type=int), 1000))
+            after = request.args.get('after', -1, type=int)
+            items, next_cursor = db.get_scraped_items(task_id, after=after, limit=limit)
+            return jsonify({'task_id': task_id, 'items': items, 'next_cursor': next_cursor})
+
         data = db.get_scraped_data(task_id)
         
         if not data:
@@ -261,42 +264,64 @@ def get_task_data(task_id):
 
 @app.route('/api/tasks/<int:task_id>/data/table')
 def get_task_data_table(task_id):
-    """Get task data in flattened table format for web display"""
+    """Get one page of task data in flattened table format for web display
+
+    Query parameters: ``limit`` and ``offset`` (or ``after``, the previous
+    page's ``next_cursor``, when not sorting), ``sort`` (a column) with
+    ``order=asc|desc``, flag filters ``is_private``/``is_verified`` and
+    substring filters ``username``/``full_name``/``biography``.
+    Rows are flattened once per data revision and served from the row cache.
+    """
     try:
-        # Get raw scraped data
-        scraped_data_records = db.get_scraped_data(task_id)
-        if not scraped_data_records:
-            return jsonify({'error': 'No data found'}), 404
-        
         # Get task details
-        tasks = db.get_tasks()
-        task = next((t for t in tasks if t['id'] == task_id), None)
+        task = db.get_task(task_id)
         if not task:
             return jsonify({'error': 'Task not found'}), 404
-        
-        # Extract the actual data
-        if isinstance(scraped_data_records, list) and len(scraped_data_records) > 0:
-            raw_data = scraped_data_records[0].get('data')
-            if isinstance(raw_data, str):
-                raw_data = json.loads(raw_data)
-        else:
-            raw_data = scraped_data_records
-        
-        # Flatten the data based on task type
-        flattened_rows = DataFormatter.format_for_task_type(task['task_type'], raw_data)
-        
-        # Get column order
-        columns = DataFormatter.get_column_order(task['task_type'])
-        if not columns and flattened_rows:
-            columns = list(flattened_rows[0].keys())
-        
+
+        row_set = row_cache.get_row_set(task)
+        if not row_set['row_count']:
+            return jsonify({'error': 'No data found'}), 404
+
+        limit = max(1, min(request.args.get('limit', TABLE_PAGE_SIZE, type=int), TABLE_MAX_PAGE_SIZE))
+        offset = max(0, request.args.get('offset', 0, type=int))
+        after = request.args.get('after', type=int)
+        sort = request.args.get('sort') or None
+        descending = request.args.get('order', 'asc').lower() == 'desc'
+
+        equals = {}
+        for field in TABLE_FLAG_FILTERS:
+            value = request.args.get(field)
+            if value is not None:
+                if value.lower() not in ('true', 'false', '1', '0'):
+                    return jsonify({'error': f'{field} must be true or false'}), 400
+                # JSON booleans read back from SQLite as 1/0
+                equals[field] = 1 if value.lower() in ('true', '1') else 0
+        contains = {
+            field: request.args[field] for field in TABLE_TEXT_FILTERS if request.args.get(field)
+        }
+
+        # ``after`` pages by row number and only applies to the original order
+        by_cursor = after is not None and not sort
+        try:
+            rows, next_cursor, has_more = db.get_task_rows_page(
+                task_id, row_set['build'], limit=limit, offset=offset, after=after, sort=sort,
+                descending=descending, equals=equals, contains=contains
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         return jsonify({
             'task_id': task_id,
             'task_type': task['task_type'],
             'target': task['target'],
-            'columns': columns,
-            'rows': flattened_rows,
-            'total_rows': len(flattened_rows)
+            'columns': row_set['columns'],
+            'rows': rows,
+            'total_rows': row_set['row_count'],
+            'offset': None if by_cursor else offset,
+            'limit': limit,
+            'has_more': has_more,
+            'next_offset': offset + len(rows) if has_more and not by_cursor else None,
+            'next_cursor': next_cursor
         })
     except Exception as e:
         print(f"Table Data Error: {str(e)}")
@@ -306,47 +331,35 @@ def get_task_data_table(task_id):
 
 @app.route('/api/tasks/<int:task_id>/export/csv')
 def export_task_csv(task_id):
-    """Export task data as flattened CSV file"""
+    """Export task data as flattened CSV file
+
+    Rows come from the row cache and are written page by page, so memory
+    use does not grow with the row count. ``?gzip=1`` streams a .csv.gz
+    instead.
+    """
     try:
-        # Get raw scraped data
-        scraped_data_records = db.get_scraped_data(task_id)
-        if not scraped_data_records:
-            return jsonify({'error': 'No data found'}), 404
-        
-        # Get task details
-        tasks = db.get_tasks()
-        task = next((t for t in tasks if t['id'] == task_id), None)
+        task = db.get_task(task_id)
         if not task:
             return jsonify({'error': 'Task not found'}), 404
-        
-        # Extract the actual data (it's stored in 'data' field of scraped_data records)
-        if isinstance(scraped_data_records, list) and len(scraped_data_records) > 0:
-            raw_data = scraped_data_records[0].get('data')
-            if isinstance(raw_data, str):
-                raw_data = json.loads(raw_data)
-        else:
-            raw_data = scraped_data_records
-        
-        # Flatten the data based on task type
-        flattened_rows = DataFormatter.format_for_task_type(task['task_type'], raw_data)
-        
-        if not flattened_rows:
-            return jsonify({'error': 'No data to export'}), 404
-        
-        # Convert to CSV
-        csv_data = DataFormatter.to_csv(flattened_rows)
-        
-        # Generate safe filename
-        safe_target = "".join(c for c in task['target'] if c.isalnum() or c in ('-', '_'))
-        filename = f"instagram_{task['task_type']}_{safe_target}_{task_id}.csv"
-        
-        return Response(
-            csv_data,
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-                'Content-Type': 'text/csv; charset=utf-8'
-            }
+
+        version = db.get_data_version(task_id)
+        if not version:
+            return jsonify({'error': 'No data found'}), 404
+
+        def make_body():
+            return DataFormatter.iter_csv(task['task_type'], row_cache.iter_row_chunks(task))
+
+        if request.args.get('gzip', type=int):
+            filename = attachment_name(task, 'csv.gz')
+            return Response(
+                gzip_chunks(encode_chunks(make_body())),
+                mimetype='application/gzip',
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+            )
+
+        return export_response(
+            make_body, attachment_name(task, 'csv'), 'text/csv; charset=utf-8',
+            f'{task_id}-csv-{version}', request
         )
     except Exception as e:
         print(f"CSV Export Error: {str(e)}")
@@ -356,36 +369,112 @@ def export_task_csv(task_id):
 
 @app.route('/api/tasks/<int:task_id>/export/json')
 def export_task_json(task_id):
-    """Export task data as JSON file"""
+    """Export task data as JSON file, streamed record by record"""
     try:
-        data = db.get_scraped_data(task_id)
-        
-        if not data:
+        task = db.get_task(task_id)
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+
+        version = db.get_data_version(task_id)
+        if not version:
             return jsonify({'error': 'No data found'}), 404
+
+        return export_response(
+            lambda: iter_json_array(db, task_id, EXPORT_PAGE_SIZE),
+            attachment_name(task, 'json'), 'application/json; charset=utf-8',
+            f'{task_id}-json-{version}', request
+        )
         
-        # Get task details
-        tasks = db.get_tasks()
-        task = next((t for t in tasks if t['id'] == task_id), None)
-        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tasks/<int:task_id>/export/ndjson')
+def export_task_ndjson(task_id):
+    """Export task items as newline-delimited JSON, one item per line"""
+    try:
+        task = db.get_task(task_id)
         if not task:
             return jsonify({'error': 'Task not found'}), 404
-        
-        # Generate safe filename
-        safe_target = "".join(c for c in task['target'] if c.isalnum() or c in ('-', '_'))
-        filename = f"instagram_{task['task_type']}_{safe_target}_{task_id}.json"
-        
-        return Response(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            mimetype='application/json',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-                'Content-Type': 'application/json; charset=utf-8'
-            }
+
+        version = db.get_data_version(task_id)
+        if not version:
+            return jsonify({'error': 'No data found'}), 404
+
+        return export_response(
+            lambda: iter_ndjson(db, task_id, EXPORT_PAGE_SIZE),
+            attachment_name(task, 'ndjson'), 'application/x-ndjson',
+            f'{task_id}-ndjson-{version}', request
         )
-        
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/tasks/<int:task_id>/export/parquet')
+def export_task_parquet(task_id):
+    """Export flattened task rows as a typed Parquet file"""
+    if parquet_export.pa is None:
+        return jsonify({'error': 'Parquet export needs pyarrow installed'}), 501
+    try:
+        task = db.get_task(task_id)
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+
+        version = db.get_data_version(task_id)
+        if not version:
+            return jsonify({'error': 'No data found'}), 404
+
+        # Parquet footers are written last, so build the file before sending
+        output = tempfile.TemporaryFile()
+        parquet_export.write_task_parquet(db, task, output, EXPORT_PAGE_SIZE)
+        output.seek(0)
+        return send_file(
+            output, mimetype='application/vnd.apache.parquet', as_attachment=True,
+            download_name=attachment_name(task, 'parquet'),
+            etag=f'{task_id}-parquet-{version}'
+        )
+
+    except Exception as e:
+        print(f"Parquet Export Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export/parquet')
+def export_tasks_parquet():
+    """Export several tasks as one partitioned Parquet dataset (zip).
+
+    ``?task_ids=1,2,3``; tasks without data are skipped.
+    """
+    if parquet_export.pa is None:
+        return jsonify({'error': 'Parquet export needs pyarrow installed'}), 501
+    try:
+        task_ids = [int(t) for t in request.args.get('task_ids', '').split(',') if t.strip()]
+    except ValueError:
+        return jsonify({'error': 'task_ids must be a comma separated list of ids'}), 400
+    if not task_ids:
+        return jsonify({'error': 'task_ids is required'}), 400
+
+    try:
+        tasks = [db.get_task(task_id) for task_id in dict.fromkeys(task_ids)]
+        tasks = [task for task in tasks if task and db.get_data_version(task['id'])]
+        if not tasks:
+            return jsonify({'error': 'No data found'}), 404
+
+        output = tempfile.TemporaryFile()
+        with tempfile.TemporaryDirectory() as base_dir:
+            paths = parquet_export.write_dataset(db, tasks, base_dir, EXPORT_PAGE_SIZE)
+            # Parquet pages are already compressed
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+                for path in paths:
+                    archive.write(os.path.join(base_dir, path), path)
+        output.seek(0)
+        return send_file(
+            output, mimetype='application/zip', as_attachment=True,
+            download_name=f"instagram_dataset_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        )
+
+    except Exception as e:
+        print(f"Parquet Export Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/stats')
 def get_stats():
     """Get overall statistics"""
@@ -403,13 +492,27 @@ def get_stats():
             'running_tasks': len([t for t in tasks if t.get('status') == 'running']),
             'completed_tasks': len([t for t in tasks if t.get('status') == 'completed']),
             'failed_tasks': len([t for t in tasks if t.get('status') == 'failed']),
-            'active_scrapers': len(active_scrapers)
+            'active_scrapers': len(task_queue.running),
+            'queue': task_queue.stats(),
+            'client_cache': client_cache.stats(),
+            'profile_cache': profile_cache.stats(),
+            'row_cache': row_cache.stats(),
+            'http': http_metrics.stats(),
+            'driver_pool': driver_pool.stats()
         }
         
         return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/queue')
+def get_queue():
+    """Task queue depth, wait times and worker utilization"""
+    try:
+        return jsonify(task_queue.stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
@@ -422,7 +525,7 @@ def health_check():
     
     return jsonify({
         'status': 'healthy' if db_status == 'connected' else 'degraded',
-        'active_scrapers': len(active_scrapers),
+        'active_scrapers': len(task_queue.running),
         'database': db_status,
         'timestamp': datetime.now().isoformat()
     })
@@ -431,15 +534,42 @@ def health_check():
 def cancel_task(task_id):
     """Cancel a running task"""
     try:
-        if task_id in active_scrapers:
+        task = db.get_task(task_id)
+        if task and task['status'] in ('pending', 'running'):
+            # Pending tasks are never claimed once failed; a running worker
+            # stops after the page it is on
             db.update_task_status(task_id, 'failed', error_message='Task cancelled by user')
-            del active_scrapers[task_id]
+            task_queue.cancel(task_id)
             return jsonify({'success': True, 'message': 'Task cancelled'})
         else:
             return jsonify({'error': 'Task not found or not running'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/tasks/<int:task_id>/resume', methods=['POST'])
+def resume_task(task_id):
+    """Queue a failed task again, continuing from its saved cursor"""
+    try:
+        task = db.get_task(task_id)
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+        if task['task_type'] not in RESUMABLE_TASK_TYPES:
+            return jsonify({'error': f"{task['task_type']} tasks cannot be resumed"}), 400
+        if task_queue.is_running(task_id):
+            # A cancelled task keeps its worker until the current page is saved
+            return jsonify({'error': 'Task is still stopping; try again shortly'}), 409
+        if not db.requeue_task(task_id):
+            return jsonify({'error': 'Only failed tasks can be resumed'}), 409
+        task_queue.notify()
+        return jsonify({
+            'success': True,
+            'message': 'Task resumed',
+            'item_count': task['item_count'],
+            'resume_cursor': task['resume_cursor'],
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -449,6 +579,31 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
+def start_background_workers():
+    """Load .env accounts and start the task workers once per process"""
+    try:
+        load_accounts_from_env()
+    except Exception as e:
+        print(f"⚠️  Warning loading accounts: {str(e)}")
+    task_queue.start()
+
+def stop_background_workers():
+    """Stop the workers and quit every pooled Chrome at interpreter exit"""
+    task_queue.stop()
+    driver_pool.close_all(include_busy=True)
+
+# Runs on import, so queued tasks are processed under `flask run` and WSGI
+# servers as well as `python app.py`. In debug mode `python app.py` re-runs
+# this module in a reloader child; the watching parent serves nothing and
+# must not start workers of its own.
+if Config.START_WORKERS and not (
+    __name__ == '__main__'
+    and os.getenv('DEBUG', 'false').lower() == 'true'
+    and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+):
+    start_background_workers()
+    atexit.register(stop_background_workers)
+
 if __name__ == '__main__':
     # Create required directories
     os.makedirs('data', exist_ok=True)
@@ -456,16 +611,10 @@ if __name__ == '__main__':
     os.makedirs('static/css', exist_ok=True)
     os.makedirs('static/js', exist_ok=True)
     
-    # Load accounts from .env file
     print("\n" + "="*60)
     print("🚀 Instagram Scraper Pro - Starting...")
     print("="*60)
     
-    try:
-        load_accounts_from_env()
-    except Exception as e:
-        print(f"⚠️  Warning loading accounts: {str(e)}")
-    
     port = int(os.getenv('PORT', 8002))
     debug_mode = os.getenv('DEBUG', 'false').lower() == 'true'
     
@@ -473,6 +622,7 @@ if __name__ == '__main__':
     print(f"🌐 Server: http://0.0.0.0:{port}")
     print(f"🔧 Debug Mode: {debug_mode}")
     print(f"💾 Database: {Config.DATABASE_PATH}")
+    print(f"👷 Workers: {task_queue.workers}")
     print("="*60 + "\n")
     
     app.run(debug=debug_mode, host='0.0.0.0', port=port, threaded=True)
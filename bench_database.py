@@ -0,0 +1,97 @@
+"""Ops/sec of the pooled WAL Database against per-call connections.
+
+Runs the same mix of concurrent readers (task polls and listings) and
+writers (progress saves and status updates) against both and prints the
+throughput and the number of ``database is locked`` errors::
+
+    python bench_database.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from database import Database
+
+
+class PerCallDatabase(Database):
+    """The previous behaviour: a fresh rollback-journal connection per call"""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+
+def run(db, seconds, readers, writers):
+    task_ids = [db.create_task('followers', f'target{i}') for i in range(writers)]
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def read():
+        while not stop.is_set():
+            try:
+                db.get_task(task_ids[0])
+                db.get_tasks(limit=20)
+                count('reads')
+            except sqlite3.OperationalError:
+                count('locked')
+
+    def write(task_id):
+        page = 0
+        while not stop.is_set():
+            try:
+                page += 1
+                items = [{'username': f'user{page}_{i}'} for i in range(10)]
+                db.save_task_progress(task_id, 'followers', items, str(page))
+                db.update_task_status(task_id, 'running')
+                count('writes')
+            except sqlite3.OperationalError:
+                count('locked')
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads += [threading.Thread(target=write, args=(task_id,)) for task_id in task_ids]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {key: value / seconds if key != 'locked' else value for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cls in (('per-call', PerCallDatabase), ('pooled WAL', Database)):
+            db = cls(os.path.join(tmp, f'{cls.__name__}.db'))
+            result = run(db, args.seconds, args.readers, args.writers)
+            print(
+                f"{name:>10}: {result['reads']:8.0f} reads/s  {result['writes']:7.0f} writes/s"
+                f"  {result['locked']:4.0f} locked errors"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -48,11 +48,50 @@ class Config:
     SCROLL_PAUSE_TIME = int(os.getenv('SCROLL_PAUSE_TIME', 2))
     REQUEST_DELAY_MIN = int(os.getenv('REQUEST_DELAY_MIN', 3))
     REQUEST_DELAY_MAX = int(os.getenv('REQUEST_DELAY_MAX', 7))
+    # Longest wait for new rows after a scroll before giving up on that step
+    SCROLL_WAIT_TIMEOUT = float(os.getenv('SCROLL_WAIT_TIMEOUT', 8))
+    # Minimum seconds between page actions; accounts can override it
+    PACING_FLOOR = float(os.getenv('PACING_FLOOR', 1.5))
     
     # Account Rotation
     MAX_TASKS_PER_ACCOUNT = int(os.getenv('MAX_TASKS_PER_ACCOUNT', 5))
     ACCOUNT_COOLDOWN_TIME = int(os.getenv('ACCOUNT_COOLDOWN_TIME', 300))
     
+    # Task Queue
+    WORKER_COUNT = int(os.getenv('WORKER_COUNT', 4))
+    MAX_CONCURRENT_TASKS_PER_ACCOUNT = int(os.getenv('MAX_CONCURRENT_TASKS_PER_ACCOUNT', 1))
+    QUEUE_POLL_INTERVAL = float(os.getenv('QUEUE_POLL_INTERVAL', 2))
+    ACCOUNT_LEASE_SECONDS = int(os.getenv('ACCOUNT_LEASE_SECONDS', 600))
+    # Run the workers in this process; with several server processes enable
+    # it in one only, since starting the queue re-queues tasks left 'running'
+    START_WORKERS = os.getenv('START_WORKERS', 'true').lower() == 'true'
+    
+    # Selenium driver pool
+    DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', 2))
+    DRIVER_MAX_TASKS = int(os.getenv('DRIVER_MAX_TASKS', 20))
+    DRIVER_MAX_HEAP_MB = int(os.getenv('DRIVER_MAX_HEAP_MB', 512))
+    CHROME_PROFILE_DIR = os.getenv('CHROME_PROFILE_DIR', 'data/chrome-profiles')
+    LEAN_BROWSER = os.getenv('LEAN_BROWSER', 'false').lower() == 'true'
+    
+    # Re-verify cached instagrapi sessions after this many seconds
+    SESSION_VERIFY_TTL = int(os.getenv('SESSION_VERIFY_TTL', 900))
+    
+    # Username -> profile cache shared by the profile lookups
+    PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', 21600))
+    PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 5000))
+    PROFILE_CACHE_PERSIST = os.getenv('PROFILE_CACHE_PERSIST', 'true').lower() == 'true'
+    
+    # Table rows of a running task are rebuilt at most this often
+    ROW_CACHE_REFRESH_SECONDS = int(os.getenv('ROW_CACHE_REFRESH_SECONDS', 30))
+    
+    # Pooled HTTP session used by the requests-based scraping paths
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+    HTTP_TIMEOUT = int(os.getenv('HTTP_TIMEOUT', 10))
+    
+    # JSON backend: auto (orjson, then msgspec, then stdlib), orjson, msgspec or stdlib
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto').lower()
+    
     # Instagram URLs
     INSTAGRAM_URL = 'https://www.instagram.com'
     INSTAGRAM_LOGIN_URL = 'https://www.instagram.com/accounts/login/'
@@ -0,0 +1,65 @@
+import re
+
+EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_RE = re.compile(r"\+?\d{1,4}?[-.\s]?\(?\d{1,3}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}")
+_DIGIT_RE = re.compile(r"\d")
+
+# Characters of an email local part
+_LOCAL_CHARS = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-"
+)
+
+
+def _iter_emails(text):
+    """Yield the matches ``EMAIL_RE.finditer`` would, anchored on each '@'.
+
+    A plain scan retries the local part from every position of a long word,
+    which is quadratic. A local part is always the run of local characters
+    right before an '@', so the pattern only has to be tried once per '@',
+    at the start of that run.
+    """
+    pos = 0
+    at = text.find("@")
+    while at != -1:
+        # '@' is not a local character, so the run never reaches back past
+        # the previous '@'
+        head = text[pos:at]
+        start = at - (len(head) - len(head.rstrip(_LOCAL_CHARS)))
+        match = EMAIL_RE.match(text, start) if start < at else None
+        if match:
+            yield match
+            pos = match.end()
+            at = text.find("@", pos)
+        else:
+            pos = at + 1
+            at = text.find("@", pos)
+
+
+def find_emails(text):
+    if not text or "@" not in text:
+        return []
+    return [match.group() for match in _iter_emails(text)]
+
+
+def find_phones(text):
+    if not text or not _DIGIT_RE.search(text):
+        return []
+    return PHONE_RE.findall(text)
+
+
+def extract_contacts(text):
+    """Return ``(emails, phones)`` found in one bio"""
+    return find_emails(text), find_phones(text)
+
+
+def extract_contacts_batch(bios):
+    """Return ``(emails, phones)`` for each bio, extracting repeated bios once"""
+    seen = {}
+    results = []
+    for bio in bios:
+        bio = bio or ""
+        if bio not in seen:
+            seen[bio] = extract_contacts(bio)
+        emails, phones = seen[bio]
+        results.append((list(emails), list(phones)))
+    return results
@@ -2,7 +2,7 @@
 
 import csv
 from io import StringIO
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List
 import json
 
 class DataFormatter:
@@ -181,13 +181,13 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def flatten_posts_data(posts_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_posts_data(posts_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """Flatten posts data into table format"""
         if not posts_data:
             return []
         
         rows = []
-        for idx, post in enumerate(posts_data, 1):
+        for idx, post in enumerate(posts_data, start):
             row = {
                 'post_number': idx,
                 # support both new ('post_url') and old ('posturl') keys
@@ -201,13 +201,13 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def flatten_followers_data(followers_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_followers_data(followers_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """Flatten followers data into table format"""
         if not followers_data:
             return []
         
         rows = []
-        for idx, follower in enumerate(followers_data, 1):
+        for idx, follower in enumerate(followers_data, start):
             row = {
                 'index': idx,
                 'username': follower.get('username', ''),
@@ -223,18 +223,18 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def flatten_following_data(following_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_following_data(following_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """Flatten following data into table format"""
-        return DataFormatter.flatten_followers_data(following_data)
+        return DataFormatter.flatten_followers_data(following_data, start)
     
     @staticmethod
-    def flatten_hashtag_data(hashtag_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_hashtag_data(hashtag_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """Flatten hashtag posts data into table format"""
         if not hashtag_data:
             return []
         
         rows = []
-        for idx, post in enumerate(hashtag_data, 1):
+        for idx, post in enumerate(hashtag_data, start):
             row = {
                 'index': idx,
                 'post_url': post.get('post_url', '') or post.get('posturl', ''),
@@ -249,7 +249,7 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def flatten_comments_data(comments_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_comments_data(comments_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """
         Flatten comments data into table format.
         With the new scraper, each comment is already a "lead":
@@ -284,7 +284,7 @@ class DataFormatter:
         ]
         
         rows = []
-        for idx, comment in enumerate(comments_data, 1):
+        for idx, comment in enumerate(comments_data, start):
             row = {"comment_number": idx}
             for field in lead_fields:
                 row[field] = comment.get(field, "")
@@ -293,13 +293,13 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def flatten_likes_data(likes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def flatten_likes_data(likes_data: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
         """Flatten likes data into table format"""
         if not likes_data:
             return []
         
         rows = []
-        for idx, like in enumerate(likes_data, 1):
+        for idx, like in enumerate(likes_data, start):
             row = {
                 'index': idx,
                 'username': like.get('username', ''),
@@ -315,8 +315,8 @@ class DataFormatter:
         return rows
     
     @staticmethod
-    def format_for_task_type(task_type: str, data: Any) -> List[Dict[str, Any]]:
-        """Format data based on task type"""
+    def format_for_task_type(task_type: str, data: Any, start: int = 1) -> List[Dict[str, Any]]:
+        """Format data based on task type; list rows are numbered from ``start``"""
         if not data:
             return []
         
@@ -334,32 +334,32 @@ class DataFormatter:
         elif task_type == 'posts':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_posts_data(data)
+            return DataFormatter.flatten_posts_data(data, start)
         
         elif task_type == 'followers':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_followers_data(data)
+            return DataFormatter.flatten_followers_data(data, start)
         
         elif task_type == 'following':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_following_data(data)
+            return DataFormatter.flatten_following_data(data, start)
         
         elif task_type == 'hashtag':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_hashtag_data(data)
+            return DataFormatter.flatten_hashtag_data(data, start)
         
         elif task_type == 'comments':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_comments_data(data)
+            return DataFormatter.flatten_comments_data(data, start)
         
         elif task_type == 'likes':
             if isinstance(data, dict):
                 data = [data]
-            return DataFormatter.flatten_likes_data(data)
+            return DataFormatter.flatten_likes_data(data, start)
         
         else:
             # Return as-is for unknown types
@@ -391,7 +391,48 @@ class DataFormatter:
         csv_data = output.getvalue()
         output.close()
         return csv_data
-    
+
+    @staticmethod
+    def iter_rows(task_type: str, items: Iterable[Any], chunk_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Flatten an item stream chunk by chunk, numbering rows continuously"""
+        chunk = []
+        start = 1
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                rows = DataFormatter.format_for_task_type(task_type, chunk, start)
+                start += len(rows)
+                chunk = []
+                yield rows
+        if chunk:
+            yield DataFormatter.format_for_task_type(task_type, chunk, start)
+
+    @staticmethod
+    def iter_csv(task_type: str, row_chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        """Write flattened row chunks as CSV text, one piece per chunk.
+
+        Columns follow ``get_column_order``, limited to the keys present in
+        the first chunk, followed by any other keys of that chunk.
+        """
+        output = StringIO()
+        writer = None
+        for rows in row_chunks:
+            if not rows:
+                continue
+            if writer is None:
+                present = {}
+                for row in rows:
+                    present.update(dict.fromkeys(row))
+                order = DataFormatter.get_column_order(task_type)
+                fieldnames = [c for c in order if c in present]
+                fieldnames += [c for c in present if c not in fieldnames]
+                writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
+                writer.writeheader()
+            writer.writerows(rows)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
     @staticmethod
     def get_column_order(task_type: str) -> List[str]:
         """Get preferred column order for each task type"""
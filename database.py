@@ -1,17 +1,83 @@
+import re
 import sqlite3
+import threading
+import queue
+import time
 from datetime import datetime
-import json
 from contextlib import contextmanager
+from json_codec import dumps, loads
 
 class Database:
-    def __init__(self, db_path='data/scraper.db'):
+    # Per-connection tuning applied once when a pooled connection is created
+    PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA cache_size=-16000',
+        'PRAGMA temp_store=MEMORY',
+    )
+
+    # Lightweight projection used by task listings; the scraped payload is
+    # only served through get_scraped_data
+    TASK_LIST_COLUMNS = (
+        'id, task_type, target, account_id, status, item_count, '
+        'error_message, created_at, started_at, completed_at'
+    )
+
+    # Row fields with an expression index on task_rows, so filtering or
+    # sorting a table page on them does not scan the whole task
+    INDEXED_ROW_FIELDS = ('username', 'is_private')
+
+    def __init__(self, db_path='data/scraper.db', pool_size=8, busy_timeout=10):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._local = threading.local()
         self.init_db()
-    
+
+    def _create_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._create_connection()
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Borrow a pooled connection for the current thread.
+
+        Nested calls on the same thread share the outer connection, so the
+        transaction is only committed (or rolled back) by the outermost block.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
         try:
             yield conn
             conn.commit()
@@ -19,7 +85,17 @@ class Database:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def close(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def init_db(self):
         with self.get_connection() as conn:
@@ -37,6 +113,9 @@ class Database:
                     cooldown_until TIMESTAMP,
                     status TEXT DEFAULT 'available',
                     ip TEXT,
+                    lease_until TIMESTAMP,
+                    active_leases INTEGER DEFAULT 0,
+                    pacing_floor REAL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
@@ -50,6 +129,13 @@ class Database:
                     account_id INTEGER,
                     status TEXT DEFAULT 'pending',
                     result TEXT,
+                    item_count INTEGER DEFAULT 0,
+                    max_items INTEGER,
+                    task_data_id INTEGER,
+                    started_at TIMESTAMP,
+                    resume_cursor TEXT,
+                    metrics TEXT,
+                    data_rev INTEGER DEFAULT 0,
                     error_message TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     completed_at TIMESTAMP,
@@ -64,20 +150,124 @@ class Database:
                     task_id INTEGER,
                     data_type TEXT NOT NULL,
                     data JSON NOT NULL,
+                    layout TEXT DEFAULT 'blob',
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (task_id) REFERENCES tasks (id)
                 )
             ''')
+
+            # One row per scraped item; seq is the item position within the task
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scraped_items (
+                    task_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    data JSON NOT NULL,
+                    PRIMARY KEY (task_id, seq),
+                    FOREIGN KEY (record_id) REFERENCES scraped_data (id)
+                ) WITHOUT ROWID
+            ''')
+
+            # Looked-up profiles shared across tasks; fetched_at is a unix time
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS profile_cache (
+                    kind TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    data JSON NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (kind, username)
+                ) WITHOUT ROWID
+            ''')
+
+            self._create_row_tables(cursor)
+
+            self._migrate(cursor)
+
+    @staticmethod
+    def _create_row_tables(cursor):
+        # Flattened table rows of a task, built from its items by row_cache.
+        # Each build writes its rows under a new build id and the header is
+        # switched to it at the end; a row set is current while its
+        # data_rev matches the task's
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_row_sets (
+                task_id INTEGER PRIMARY KEY,
+                data_rev INTEGER NOT NULL,
+                build INTEGER NOT NULL DEFAULT 0,
+                columns JSON NOT NULL,
+                row_count INTEGER NOT NULL,
+                built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (task_id) REFERENCES tasks (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_rows (
+                task_id INTEGER NOT NULL,
+                build INTEGER NOT NULL,
+                row_num INTEGER NOT NULL,
+                data JSON NOT NULL,
+                PRIMARY KEY (task_id, build, row_num)
+            ) WITHOUT ROWID
+        ''')
+
+    def _migrate(self, cursor):
+        """Bring databases created by older versions up to the current schema"""
+        self._ensure_column(cursor, 'tasks', 'item_count', 'INTEGER DEFAULT 0')
+        self._ensure_column(cursor, 'tasks', 'max_items', 'INTEGER')
+        self._ensure_column(cursor, 'tasks', 'task_data_id', 'INTEGER')
+        self._ensure_column(cursor, 'tasks', 'started_at', 'TIMESTAMP')
+        self._ensure_column(cursor, 'tasks', 'resume_cursor', 'TEXT')
+        self._ensure_column(cursor, 'tasks', 'metrics', 'TEXT')
+        # Bumped on every write to the task's scraped data
+        self._ensure_column(cursor, 'tasks', 'data_rev', 'INTEGER DEFAULT 0')
+        self._ensure_column(cursor, 'accounts', 'lease_until', 'TIMESTAMP')
+        self._ensure_column(cursor, 'accounts', 'active_leases', 'INTEGER DEFAULT 0')
+        self._ensure_column(cursor, 'accounts', 'pacing_floor', 'REAL')
+        # 'blob' records keep the whole payload in scraped_data.data; 'list' and
+        # 'object' records keep it in scraped_items
+        self._ensure_column(cursor, 'scraped_data', 'layout', "TEXT DEFAULT 'blob'")
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraped_data_task ON scraped_data (task_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_accounts_status ON accounts (status, cooldown_until)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraped_items_record ON scraped_items (record_id, seq)')
+        # Row sets are a rebuildable cache: drop ones stored without build ids
+        cursor.execute('PRAGMA table_info(task_rows)')
+        if 'build' not in {row['name'] for row in cursor.fetchall()}:
+            cursor.execute('DROP TABLE task_rows')
+            cursor.execute('DROP TABLE task_row_sets')
+            self._create_row_tables(cursor)
+        for field in self.INDEXED_ROW_FIELDS:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_task_rows_{field} '
+                f'ON task_rows (task_id, build, {self._row_field(field)})'
+            )
+
+    @staticmethod
+    def _ensure_column(cursor, table, column, definition):
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in {row['name'] for row in cursor.fetchall()}:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
     
     # Account Management
-    def add_account(self, username, password, proxy=None):
+    def add_account(self, username, password, proxy=None, pacing_floor=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'INSERT INTO accounts (username, password, ip) VALUES (?, ?, ?)',
-                (username, password, proxy)
+                'INSERT INTO accounts (username, password, ip, pacing_floor) VALUES (?, ?, ?, ?)',
+                (username, password, proxy, pacing_floor)
             )
             return cursor.lastrowid
+
+    def set_account_pacing(self, account_id, pacing_floor):
+        """Override the minimum seconds between page actions (None = default)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE accounts SET pacing_floor = ? WHERE id = ?',
+                (pacing_floor, account_id)
+            )
+            return cursor.rowcount > 0
     
     # def get_available_account(self):
     #     with self.get_connection() as conn:
@@ -124,7 +314,11 @@ class Database:
             if row:
                 account = dict(row)
                 # Auto-activate this account
-                self.activate_account(account['id'])
+                cursor.execute(
+                    'UPDATE accounts SET is_active = 1, status = ? WHERE id = ?',
+                    ('available', account['id'])
+                )
+                print(f"✅ Account {account['id']} automatically activated")
                 # Return the updated account data
                 cursor.execute('SELECT * FROM accounts WHERE id = ?', (account['id'],))
                 return dict(cursor.fetchone())
@@ -140,13 +334,94 @@ class Database:
             if row:
                 account = dict(row)
                 # Reset cooldown and activate
-                self.reset_account_cooldown(account['id'])
-                self.activate_account(account['id'])
+                cursor.execute(
+                    'UPDATE accounts SET cooldown_until = NULL, is_active = 1, status = ? WHERE id = ?',
+                    ('available', account['id'])
+                )
+                print(f"🔄 Account {account['id']} cooldown reset and activated")
                 cursor.execute('SELECT * FROM accounts WHERE id = ?', (account['id'],))
                 return dict(cursor.fetchone())
             
             return None   
         
+    def lease_account(self, lease_seconds=600, max_leases=1):
+        """Atomically pick an account and lease it to the caller.
+
+        Uses the same preference as get_available_account (active and out of
+        cooldown first, then any out of cooldown, then the earliest cooldown)
+        but selects and marks the account in one UPDATE ... RETURNING, so two
+        workers can never lease the same account beyond ``max_leases``.
+        Leases past ``lease_until`` are treated as abandoned, which frees
+        accounts held by crashed workers.
+        """
+        from datetime import timedelta
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=lease_seconds)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE accounts SET
+                    active_leases = CASE
+                        WHEN lease_until IS NULL OR lease_until < :now THEN 1
+                        ELSE active_leases + 1
+                    END,
+                    lease_until = :lease_until,
+                    cooldown_until = CASE
+                        WHEN cooldown_until >= datetime('now') THEN NULL
+                        ELSE cooldown_until
+                    END,
+                    is_active = 1,
+                    status = 'in_use',
+                    last_used = :now
+                WHERE id = (
+                    SELECT id FROM accounts
+                    WHERE lease_until IS NULL OR lease_until < :now OR active_leases < :max_leases
+                    ORDER BY
+                        CASE
+                            WHEN is_active = 1 AND status IN ('available', 'in_use')
+                                 AND (cooldown_until IS NULL OR cooldown_until < datetime('now')) THEN 0
+                            WHEN cooldown_until IS NULL OR cooldown_until < datetime('now') THEN 1
+                            ELSE 2
+                        END,
+                        CASE
+                            WHEN lease_until IS NULL OR lease_until < :now THEN 0
+                            ELSE active_leases
+                        END,
+                        cooldown_until ASC, tasks_completed ASC, last_used ASC
+                    LIMIT 1
+                )
+                RETURNING *
+            ''', {'now': now, 'lease_until': lease_until, 'max_leases': max_leases})
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def renew_account_lease(self, account_id, lease_seconds=600):
+        """Extend a lease held by a long-running task"""
+        from datetime import timedelta
+        lease_until = datetime.now() + timedelta(seconds=lease_seconds)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'UPDATE accounts SET lease_until = ? WHERE id = ? AND active_leases > 0',
+                (lease_until, account_id)
+            )
+
+    def release_account(self, account_id):
+        """Return a leased account; it becomes available once its last lease ends"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE accounts SET
+                    status = CASE
+                        WHEN active_leases <= 1 AND status = 'in_use' THEN 'available'
+                        ELSE status
+                    END,
+                    lease_until = CASE WHEN active_leases <= 1 THEN NULL ELSE lease_until END,
+                    active_leases = MAX(active_leases - 1, 0),
+                    last_used = ?
+                WHERE id = ?
+            ''', (datetime.now(), account_id))
+
     def update_account_status(self, account_id, status):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -180,75 +455,617 @@ class Database:
             return [dict(row) for row in cursor.fetchall()]
     
     # Task Management
-    def create_task(self, task_type, target, account_id=None):
+    def create_task(self, task_type, target, account_id=None, max_items=None, task_data_id=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'INSERT INTO tasks (task_type, target, account_id) VALUES (?, ?, ?)',
-                (task_type, target, account_id)
+                '''INSERT INTO tasks (task_type, target, account_id, max_items, task_data_id)
+                   VALUES (?, ?, ?, ?, ?)''',
+                (task_type, target, account_id, max_items, task_data_id)
             )
             return cursor.lastrowid
+
+    # Task Queue
+    def has_pending_tasks(self):
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT 1 FROM tasks WHERE status = 'pending' LIMIT 1").fetchone()
+            return row is not None
+
+    def claim_next_task(self):
+        """Atomically move the oldest pending task to 'running' and return it"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE tasks
+                SET status = 'running', started_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM tasks WHERE status = 'pending' ORDER BY id LIMIT 1
+                )
+                AND status = 'pending'
+                RETURNING *
+            ''')
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def requeue_interrupted_tasks(self):
+        """Put tasks left 'running' by a previous process back in the queue"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE tasks SET status = 'pending', started_at = NULL WHERE status = 'running'"
+            )
+            return cursor.rowcount
+
+    def requeue_task(self, task_id):
+        """Move a failed task back to 'pending', keeping its items and cursor"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''UPDATE tasks
+                   SET status = 'pending', error_message = NULL,
+                       started_at = NULL, completed_at = NULL
+                   WHERE id = ? AND status = 'failed' ''',
+                (task_id,)
+            )
+            return cursor.rowcount > 0
+
+    def get_queue_stats(self, window=50):
+        """Queue depth and wait times (seconds between creation and start)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    SUM(status = 'pending') AS pending,
+                    SUM(status = 'running') AS running,
+                    MAX(CASE WHEN status = 'pending'
+                        THEN (julianday('now') - julianday(created_at)) * 86400 END) AS oldest_wait
+                FROM tasks WHERE status IN ('pending', 'running')
+            ''')
+            depth = cursor.fetchone()
+            cursor.execute(
+                'SELECT COUNT(*) FROM accounts WHERE active_leases > 0 AND lease_until >= ?',
+                (datetime.now(),)
+            )
+            leased_accounts = cursor.fetchone()[0]
+            cursor.execute('''
+                SELECT AVG((julianday(started_at) - julianday(created_at)) * 86400) AS avg_wait
+                FROM (
+                    SELECT started_at, created_at FROM tasks
+                    WHERE started_at IS NOT NULL ORDER BY id DESC LIMIT ?
+                )
+            ''', (window,))
+            avg_wait = cursor.fetchone()['avg_wait']
+            return {
+                'pending': depth['pending'] or 0,
+                'running': depth['running'] or 0,
+                'oldest_pending_wait_seconds': round(depth['oldest_wait'] or 0, 1),
+                'avg_wait_seconds': round(avg_wait or 0, 1),
+                'leased_accounts': leased_accounts,
+            }
     
-    def update_task_status(self, task_id, status, result=None, error_message=None):
+    def update_task_status(self, task_id, status, result=None, error_message=None, item_count=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             completed_at = datetime.now() if status == 'completed' else None
             if isinstance(result, (dict, list)):
-                result_to_store = json.dumps(result, default=str)
+                if item_count is None:
+                    item_count = len(result) if isinstance(result, list) else 1
+                result_to_store = dumps(result)
             else:
                 result_to_store = result
             cursor.execute(
                 '''UPDATE tasks 
-                   SET status = ?, result = ?, error_message = ?, completed_at = ?
+                   SET status = ?, result = ?, error_message = ?, completed_at = ?,
+                       item_count = COALESCE(?, item_count)
                    WHERE id = ?''',
-                (status, result_to_store, error_message, completed_at, task_id)
+                (status, result_to_store, error_message, completed_at, item_count, task_id)
             )
 
     def update_task_data(self, task_id, result):
-        if isinstance(result, (dict, list)):
-            result_to_store = json.dumps(result, default=str)
-        else:
-            result_to_store = result
+        """Replace the stored payload of every data record of a task"""
+        layout = 'list' if isinstance(result, list) else 'object'
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id FROM scraped_data WHERE task_id = ? ORDER BY id', (task_id,))
+            record_ids = [row['id'] for row in cursor.fetchall()]
+            cursor.execute('DELETE FROM scraped_items WHERE task_id = ?', (task_id,))
+            for record_id in record_ids:
+                cursor.execute(
+                    'UPDATE scraped_data SET data = ?, layout = ? WHERE id = ?',
+                    ('null', layout, record_id)
+                )
+                self._insert_items(cursor, task_id, record_id, self._as_items(result))
+            self._touch_data(cursor, task_id)
+    
+    def get_task(self, task_id):
+        """Fetch a single task by primary key"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            task = dict(row)
+            task['metrics'] = loads(task['metrics']) if task['metrics'] else {}
+            return task
+
+    def update_task_metrics(self, task_id, metrics):
+        """Merge ``metrics`` into the task's stored metrics"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT metrics FROM tasks WHERE id = ?', (task_id,))
+            row = cursor.fetchone()
+            if not row:
+                return
+            merged = loads(row['metrics']) if row['metrics'] else {}
+            merged.update(metrics)
             cursor.execute(
-                '''UPDATE scraped_data 
-                   SET data = ?
-                   WHERE task_id = ?''',
-                (result_to_store, task_id)
+                'UPDATE tasks SET metrics = ? WHERE id = ?',
+                (dumps(merged), task_id)
             )
-    
+
     def get_tasks(self, status=None, limit=50):
+        """List tasks without their result payloads"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if status:
                 cursor.execute(
-                    'SELECT * FROM tasks WHERE status = ? ORDER BY id DESC LIMIT ?',
+                    f'SELECT {self.TASK_LIST_COLUMNS} FROM tasks WHERE status = ? ORDER BY id DESC LIMIT ?',
                     (status, limit)
                 )
             else:
-                cursor.execute('SELECT * FROM tasks ORDER BY id DESC LIMIT ?', (limit,))
+                cursor.execute(
+                    f'SELECT {self.TASK_LIST_COLUMNS} FROM tasks ORDER BY id DESC LIMIT ?',
+                    (limit,)
+                )
             return [dict(row) for row in cursor.fetchall()]
     
     # Data Storage
+    @staticmethod
+    def _as_items(data):
+        if isinstance(data, list):
+            return data
+        return [] if data is None else [data]
+
+    @staticmethod
+    def _insert_items(cursor, task_id, record_id, items):
+        cursor.execute(
+            'SELECT COALESCE(MAX(seq), -1) + 1 FROM scraped_items WHERE task_id = ?',
+            (task_id,)
+        )
+        start = cursor.fetchone()[0]
+        cursor.executemany(
+            'INSERT INTO scraped_items (task_id, seq, record_id, data) VALUES (?, ?, ?, ?)',
+            (
+                (task_id, start + offset, record_id, dumps(item))
+                for offset, item in enumerate(items)
+            )
+        )
+
+    @staticmethod
+    def _touch_data(cursor, task_id):
+        cursor.execute(
+            'UPDATE tasks SET data_rev = COALESCE(data_rev, 0) + 1 WHERE id = ?', (task_id,)
+        )
+
     def save_scraped_data(self, task_id, data_type, data):
+        layout = 'list' if isinstance(data, list) else 'object'
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'INSERT INTO scraped_data (task_id, data_type, data) VALUES (?, ?, ?)',
-                (task_id, data_type, json.dumps(data, default=str))
+                'INSERT INTO scraped_data (task_id, data_type, data, layout) VALUES (?, ?, ?, ?)',
+                (task_id, data_type, 'null', layout)
             )
-            return cursor.lastrowid
+            record_id = cursor.lastrowid
+            self._insert_items(cursor, task_id, record_id, self._as_items(data))
+            self._touch_data(cursor, task_id)
+            return record_id
+
+    def append_scraped_items(self, task_id, data_type, items):
+        """Append items to the task's first data record, creating it if needed.
+
+        Only the new items are written, so callers can persist results
+        incrementally instead of rewriting the whole list.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT id, layout, data FROM scraped_data WHERE task_id = ? ORDER BY id LIMIT 1',
+                (task_id,)
+            )
+            record = cursor.fetchone()
+            if record is None:
+                cursor.execute(
+                    'INSERT INTO scraped_data (task_id, data_type, data, layout) VALUES (?, ?, ?, ?)',
+                    (task_id, data_type, 'null', 'list')
+                )
+                record_id = cursor.lastrowid
+            else:
+                record_id = record['id']
+                if record['layout'] != 'list':
+                    # Move a legacy or single-object payload into item rows first
+                    existing = self._load_record(cursor, record)
+                    cursor.execute('DELETE FROM scraped_items WHERE record_id = ?', (record_id,))
+                    cursor.execute(
+                        'UPDATE scraped_data SET data = ?, layout = ? WHERE id = ?',
+                        ('null', 'list', record_id)
+                    )
+                    self._insert_items(cursor, task_id, record_id, self._as_items(existing))
+            self._insert_items(cursor, task_id, record_id, items)
+            self._touch_data(cursor, task_id)
+            return record_id
+
+    def save_task_progress(self, task_id, data_type, items, resume_cursor):
+        """Append a chunk of items and record the cursor to resume after it.
+
+        Both writes share one transaction, so a restarted task never sees
+        items without the matching cursor (or the other way round).
+        """
+        with self.get_connection() as conn:
+            self.append_scraped_items(task_id, data_type, items)
+            conn.execute(
+                '''UPDATE tasks
+                   SET resume_cursor = ?,
+                       item_count = (SELECT COUNT(*) FROM scraped_items WHERE task_id = ?)
+                   WHERE id = ?''',
+                (resume_cursor, task_id, task_id)
+            )
+
+    def count_scraped_items(self, task_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM scraped_items WHERE task_id = ?', (task_id,))
+            return cursor.fetchone()[0]
+
+    def get_scraped_field_values(self, task_id, field):
+        """Return the set of values a top-level item field takes in a task"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT json_extract(data, ?) AS value FROM scraped_items WHERE task_id = ?',
+                (f'$.{field}', task_id)
+            )
+            return {row['value'] for row in cursor.fetchall() if row['value'] is not None}
+
+    def _load_record(self, cursor, row):
+        if row['layout'] == 'blob':
+            return loads(row['data'])
+        cursor.execute(
+            'SELECT data FROM scraped_items WHERE record_id = ? ORDER BY seq',
+            (row['id'],)
+        )
+        items = [loads(item['data']) for item in cursor.fetchall()]
+        if row['layout'] == 'object':
+            return items[0] if items else None
+        return items
     
     def get_scraped_data(self, task_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM scraped_data WHERE task_id = ?', (task_id,))
+            cursor.execute('SELECT * FROM scraped_data WHERE task_id = ? ORDER BY id', (task_id,))
             results = cursor.fetchall()
             return [{'id': row['id'], 'data_type': row['data_type'], 
-                    'data': json.loads(row['data']), 'created_at': row['created_at']} 
+                    'data': self._load_record(cursor, row), 'created_at': row['created_at']} 
                    for row in results]
-            
+
+    def get_scraped_records(self, task_id):
+        """Record headers of a task, without their payloads"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT id, data_type, layout, created_at FROM scraped_data WHERE task_id = ? ORDER BY id',
+                (task_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def iter_record_items(self, record, batch_size=500):
+        """Yield the items of one record header, reading ``batch_size`` rows at a time"""
+        if record['layout'] == 'blob':
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    'SELECT data FROM scraped_data WHERE id = ?', (record['id'],)
+                ).fetchone()
+            yield from self._as_items(loads(row['data']) if row else None)
+            return
+
+        after = -1
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    '''SELECT seq, data FROM scraped_items
+                       WHERE record_id = ? AND seq > ?
+                       ORDER BY seq LIMIT ?''',
+                    (record['id'], after, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield loads(row['data'])
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]['seq']
+
+    def load_record_data(self, record):
+        """Whole payload of one record header, in its stored shape"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, layout, data FROM scraped_data WHERE id = ?', (record['id'],))
+            row = cursor.fetchone()
+            return self._load_record(cursor, row) if row else None
+
+    def get_data_version(self, task_id):
+        """Short string that changes whenever the task's stored data does, or None without data"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                '''SELECT
+                       (SELECT COUNT(*) FROM scraped_data WHERE task_id = ?) AS records,
+                       (SELECT MAX(id) FROM scraped_data WHERE task_id = ?) AS last_record,
+                       (SELECT COUNT(*) FROM scraped_items WHERE task_id = ?) AS items,
+                       (SELECT MAX(seq) FROM scraped_items WHERE task_id = ?) AS last_seq,
+                       (SELECT COALESCE(data_rev, 0) FROM tasks WHERE id = ?) AS data_rev''',
+                (task_id, task_id, task_id, task_id, task_id)
+            ).fetchone()
+            if not row['records']:
+                return None
+            # data_rev catches rewrites that keep the counts, e.g. update_task_data
+            return (
+                f"{row['records']}.{row['last_record']}.{row['items']}."
+                f"{row['last_seq']}.{row['data_rev']}"
+            )
+
+    def get_scraped_items(self, task_id, after=-1, limit=500):
+        """Read one page of items from the task's first data record.
+
+        Returns ``(items, cursor)``; pass ``cursor`` back as ``after`` to read
+        the next page. ``cursor`` is None once the data is exhausted.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT id, layout, data FROM scraped_data WHERE task_id = ? ORDER BY id LIMIT 1',
+                (task_id,)
+            )
+            record = cursor.fetchone()
+            if not record:
+                return [], None
+
+            if record['layout'] == 'blob':
+                # Legacy records: the cursor is the position in the stored list
+                data = self._as_items(loads(record['data']))
+                items = data[after + 1:after + 1 + limit]
+                next_cursor = after + len(items) if after + 1 + limit < len(data) else None
+                return items, next_cursor
+
+            cursor.execute(
+                '''SELECT seq, data FROM scraped_items
+                   WHERE record_id = ? AND seq > ?
+                   ORDER BY seq LIMIT ?''',
+                (record['id'], after, limit)
+            )
+            rows = cursor.fetchall()
+            items = [loads(row['data']) for row in rows]
+            next_cursor = rows[-1]['seq'] if len(rows) == limit else None
+            return items, next_cursor
+
+    def iter_scraped_items(self, task_id, batch_size=500, limit=None):
+        """Yield the task's items page by page without loading them all at once"""
+        after = -1
+        yielded = 0
+        while True:
+            page_size = batch_size if limit is None else min(batch_size, limit - yielded)
+            if page_size <= 0:
+                return
+            items, after = self.get_scraped_items(task_id, after=after, limit=page_size)
+            for item in items:
+                yield item
+            yielded += len(items)
+            if after is None:
+                return
+
+    # Materialized table rows
+    def get_data_rev(self, task_id):
+        with self.get_connection() as conn:
+            row = conn.execute('SELECT data_rev FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            return (row['data_rev'] or 0) if row else None
+
+    def get_row_set(self, task_id):
+        """Header of the task's materialized rows, or None if never built.
+
+        ``current`` tells whether the rows match the task's data revision and
+        ``age_seconds`` how long ago they were built.
+        """
+        with self.get_connection() as conn:
+            row = conn.execute(
+                '''SELECT s.task_id, s.data_rev, s.build, s.columns, s.row_count, s.built_at,
+                          s.data_rev = COALESCE(t.data_rev, 0) AS current,
+                          (julianday('now') - julianday(s.built_at)) * 86400 AS age_seconds
+                   FROM task_row_sets s JOIN tasks t ON t.id = s.task_id
+                   WHERE s.task_id = ?''',
+                (task_id,)
+            ).fetchone()
+            if not row:
+                return None
+            row_set = dict(row)
+            row_set['columns'] = loads(row_set['columns'])
+            row_set['current'] = bool(row_set['current'])
+            return row_set
+
+    def replace_task_rows(self, task_id, data_rev, columns, row_chunks, batch_size=5000):
+        """Store flattened rows built from data revision ``data_rev``.
+
+        Rows are written under a new build id, one short transaction per
+        chunk, so writers of the task's data are never held up for the whole
+        build; readers keep using the previous build until the header is
+        switched at the end. The build it replaces is kept until the next
+        one, so a reader still streaming it is not cut short. Returns
+        ``(build, row_count)``.
+        """
+        build = time.time_ns()
+        row_count = 0
+        for rows in row_chunks:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    'INSERT INTO task_rows (task_id, build, row_num, data) VALUES (?, ?, ?, ?)',
+                    (
+                        (task_id, build, row_count + offset, dumps(row))
+                        for offset, row in enumerate(rows)
+                    )
+                )
+            row_count += len(rows)
+
+        with self.get_connection() as conn:
+            current = conn.execute(
+                'SELECT build FROM task_row_sets WHERE task_id = ?', (task_id,)
+            ).fetchone()
+            # A build from an older revision never replaces a newer one
+            switched = conn.execute(
+                '''INSERT INTO task_row_sets (task_id, data_rev, build, columns, row_count)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(task_id) DO UPDATE SET
+                       data_rev = excluded.data_rev, build = excluded.build,
+                       columns = excluded.columns, row_count = excluded.row_count,
+                       built_at = CURRENT_TIMESTAMP
+                   WHERE excluded.data_rev >= task_row_sets.data_rev''',
+                (task_id, data_rev, build, dumps(columns), row_count)
+            ).rowcount
+
+        if switched:
+            if current:
+                self._prune_task_rows(task_id, current['build'], batch_size)
+        else:
+            self._delete_row_build(task_id, build, batch_size)
+        return build, row_count
+
+    def _prune_task_rows(self, task_id, before, batch_size=5000):
+        """Delete the task's builds older than ``before``"""
+        with self.get_connection() as conn:
+            builds = [
+                row['build'] for row in conn.execute(
+                    'SELECT DISTINCT build FROM task_rows WHERE task_id = ? AND build < ?',
+                    (task_id, before)
+                )
+            ]
+        for build in builds:
+            self._delete_row_build(task_id, build, batch_size)
+
+    def _delete_row_build(self, task_id, build, batch_size=5000):
+        # Batched like the build itself, so the write lock is released in between
+        while True:
+            with self.get_connection() as conn:
+                deleted = conn.execute(
+                    '''DELETE FROM task_rows WHERE task_id = ? AND build = ? AND row_num IN (
+                           SELECT row_num FROM task_rows WHERE task_id = ? AND build = ?
+                           ORDER BY row_num LIMIT ?)''',
+                    (task_id, build, task_id, build, batch_size)
+                ).rowcount
+            if deleted < batch_size:
+                return
+
+    def iter_task_rows(self, task_id, build, batch_size=1000):
+        """Yield the rows of one build of the task in lists of up to ``batch_size``"""
+        after = -1
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    '''SELECT row_num, data FROM task_rows
+                       WHERE task_id = ? AND build = ? AND row_num > ?
+                       ORDER BY row_num LIMIT ?''',
+                    (task_id, build, after, batch_size)
+                ).fetchall()
+            if rows:
+                yield [loads(row['data']) for row in rows]
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]['row_num']
+
+    @staticmethod
+    def _row_field(field):
+        # Inlined rather than bound so the expression matches the indexes
+        if not re.fullmatch(r'[A-Za-z0-9_]+', field or ''):
+            raise ValueError(f'Invalid column name: {field!r}')
+        return f"json_extract(data, '$.{field}')"
+
+    def get_task_rows_page(
+        self, task_id, build, limit=100, offset=0, after=None, sort=None, descending=False,
+        equals=None, contains=None
+    ):
+        """One page of one build of the task's rows, filtered and sorted in SQL.
+
+        ``equals`` and ``contains`` map row fields to a value or a
+        (case-insensitive) substring. Without ``sort`` rows keep their
+        original order and ``after`` (a row number) can replace ``offset``.
+        Returns ``(rows, next_cursor, has_more)``; ``next_cursor`` is the last
+        row number of the page, or None on the last page or with ``sort``.
+        """
+        where = ['task_id = ?', 'build = ?']
+        params = [task_id, build]
+        for field, value in (equals or {}).items():
+            where.append(f'{self._row_field(field)} = ?')
+            params.append(value)
+        for field, text in (contains or {}).items():
+            escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append(f"{self._row_field(field)} LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+
+        direction = 'DESC' if descending else 'ASC'
+        table = 'task_rows'
+        if sort:
+            order = f'{self._row_field(sort)} {direction}, row_num {direction}'
+        else:
+            order = f'row_num {direction}'
+            if after is not None:
+                where.append('row_num < ?' if descending else 'row_num > ?')
+                params.append(after)
+                offset = 0
+            # The planner prefers the primary key for row order, but an index
+            # on an equality-filtered field already yields matches in row order
+            indexed = [field for field in (equals or {}) if field in self.INDEXED_ROW_FIELDS]
+            if indexed:
+                table = f'task_rows INDEXED BY idx_task_rows_{indexed[0]}'
+
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f'''SELECT row_num, data FROM {table}
+                    WHERE {' AND '.join(where)}
+                    ORDER BY {order} LIMIT ? OFFSET ?''',
+                (*params, limit + 1, offset)
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = rows[-1]['row_num'] if rows and has_more and not sort else None
+        return [loads(row['data']) for row in rows], next_cursor, has_more
+
+    # Profile cache
+    def get_cached_profile(self, kind, username, max_age):
+        """Return ``(profile, fetched_at)`` if cached within ``max_age`` seconds"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT data, fetched_at FROM profile_cache '
+                'WHERE kind = ? AND username = ? AND fetched_at > ?',
+                (kind, username, time.time() - max_age)
+            )
+            row = cursor.fetchone()
+            return (loads(row['data']), row['fetched_at']) if row else None
+
+    def save_cached_profile(self, kind, username, profile, fetched_at=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT OR REPLACE INTO profile_cache (kind, username, data, fetched_at) '
+                'VALUES (?, ?, ?, ?)',
+                (kind, username, dumps(profile), fetched_at or time.time())
+            )
+
+    def purge_cached_profiles(self, max_age):
+        """Delete cached profiles older than ``max_age`` seconds"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'DELETE FROM profile_cache WHERE fetched_at <= ?',
+                (time.time() - max_age,)
+            )
+            return cursor.rowcount
+
     def activate_account(self, account_id):
         """Activate an account when a task is assigned"""
         with self.get_connection() as conn:
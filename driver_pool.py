@@ -0,0 +1,194 @@
+import itertools
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+from scraper import InstagramScraper
+
+
+class DriverPool:
+    """Pool of warm, logged-in Chrome drivers keyed by account.
+
+    Launching undetected Chrome and logging in dominates short Selenium
+    tasks, so drivers are kept alive between tasks and handed back to the
+    same account. A driver is health-checked before reuse and recycled after
+    ``max_tasks`` tasks or once its page heap grows past ``max_heap_mb``;
+    its Chrome profile directory is deleted with it.
+    """
+
+    def __init__(
+        self,
+        max_size=Config.DRIVER_POOL_SIZE,
+        max_tasks=Config.DRIVER_MAX_TASKS,
+        max_heap_mb=Config.DRIVER_MAX_HEAP_MB,
+        profile_root=Config.CHROME_PROFILE_DIR,
+    ):
+        self.max_size = max_size
+        self.max_tasks = max_tasks
+        self.max_heap_mb = max_heap_mb
+        self.profile_root = profile_root
+        self._idle = {}
+        # Checked-out entries by id, so close_all can reach them at shutdown
+        self._busy = {}
+        self._in_use = 0
+        self._slots = 0
+        self._cond = threading.Condition()
+        self._ids = itertools.count()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+
+    @contextmanager
+    def acquire(self, username, password):
+        """Borrow a logged-in scraper for ``username``"""
+        entry = self._checkout(username, password)
+        with self._cond:
+            self._busy[id(entry)] = entry
+        healthy = False
+        try:
+            yield entry['scraper']
+            healthy = True
+        finally:
+            with self._cond:
+                self._busy.pop(id(entry), None)
+            self._checkin(username, entry, healthy)
+
+    def _checkout(self, username, password):
+        victim = None
+        with self._cond:
+            while True:
+                idle = self._idle.get(username)
+                if idle:
+                    entry = idle.pop()
+                    self._in_use += 1
+                    break
+                if self._slots < self.max_size:
+                    entry = None
+                    self._slots += 1
+                    self._in_use += 1
+                    break
+                # Take over the slot of the least recently used idle driver
+                victim = self._oldest_idle()
+                if victim:
+                    entry = None
+                    self._in_use += 1
+                    break
+                self._cond.wait()
+
+        if victim:
+            self._close(victim)
+
+        if entry and entry['scraper'].is_driver_alive() and entry['scraper'].is_logged_in:
+            self.reused += 1
+            return entry
+
+        if entry:
+            # Stale browser; replace it in the same slot
+            self._close(entry)
+
+        try:
+            return self._launch(username, password)
+        except Exception:
+            with self._cond:
+                self._slots -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _launch(self, username, password):
+        profile_dir = os.path.join(self.profile_root, f'{username}-{next(self._ids)}')
+        scraper = InstagramScraper(profile_dir=profile_dir)
+        entry = {
+            'scraper': scraper, 'profile_dir': profile_dir,
+            'tasks': 0, 'last_used': time.monotonic(),
+        }
+        try:
+            scraper.init_driver()
+            logged_in = scraper.login(username, password)
+        except Exception:
+            self._discard(entry)
+            raise
+        if not logged_in:
+            self._discard(entry)
+            raise Exception("Login failed")
+        self.created += 1
+        return entry
+
+    def _checkin(self, username, entry, healthy):
+        entry['tasks'] += 1
+        entry['last_used'] = time.monotonic()
+        scraper = entry['scraper']
+
+        heap = scraper.js_heap_mb() if healthy else None
+        keep = (
+            healthy
+            and entry['tasks'] < self.max_tasks
+            and (heap is None or heap < self.max_heap_mb)
+            and scraper.is_driver_alive()
+        )
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.setdefault(username, []).append(entry)
+            else:
+                self._slots -= 1
+            self._cond.notify()
+
+        if not keep:
+            self._close(entry)
+
+    def _oldest_idle(self):
+        oldest = None
+        for username, entries in self._idle.items():
+            for entry in entries:
+                if oldest is None or entry['last_used'] < oldest[1]['last_used']:
+                    oldest = (username, entry)
+        if not oldest:
+            return None
+        self._idle[oldest[0]].remove(oldest[1])
+        return oldest[1]
+
+    def _discard(self, entry):
+        try:
+            entry['scraper'].close()
+        finally:
+            shutil.rmtree(entry['profile_dir'], ignore_errors=True)
+
+    def _close(self, entry):
+        self._discard(entry)
+        self.recycled += 1
+
+    def close_all(self, include_busy=False):
+        """Close idle drivers, and with ``include_busy`` the checked-out ones too.
+
+        ``include_busy`` is meant for process exit, when the tasks using
+        them are abandoned anyway.
+        """
+        with self._cond:
+            entries = [e for idle in self._idle.values() for e in idle]
+            self._idle.clear()
+            self._slots -= len(entries)
+            busy = list(self._busy.values()) if include_busy else []
+        for entry in entries + busy:
+            try:
+                self._close(entry)
+            except Exception:
+                continue
+
+    def stats(self):
+        with self._cond:
+            idle = sum(len(entries) for entries in self._idle.values())
+            return {
+                'size': self._slots,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': idle,
+                'utilization': round(self._in_use / self.max_size, 2) if self.max_size else 0,
+                'created': self.created,
+                'reused': self.reused,
+                'recycled': self.recycled,
+            }
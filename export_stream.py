@@ -0,0 +1,237 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import Response
+
+from json_codec import dumps, dumps_pretty
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Flush compressed output roughly this often so clients see steady progress
+FLUSH_BYTES = 256 * 1024
+
+
+def encode_chunks(chunks, encoding='utf-8'):
+    for chunk in chunks:
+        if chunk:
+            yield chunk.encode(encoding)
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of bytes chunks without buffering the whole body"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    pending = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= FLUSH_BYTES:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def zstd_chunks(chunks, level=3):
+    """Zstandard-compress a stream of bytes chunks (needs the zstandard package)"""
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    pending = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= FLUSH_BYTES:
+            out += compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def attachment_name(task, extension):
+    safe_target = "".join(c for c in task['target'] if c.isalnum() or c in ('-', '_'))
+    return f"instagram_{task['task_type']}_{safe_target}_{task['id']}.{extension}"
+
+
+# ---------------------------------------------------------------- bodies
+
+def _indent(text, pad):
+    # Pretty JSON never has raw newlines inside strings, so every line break
+    # starts a new line of structure
+    return pad + text.replace('\n', '\n' + pad)
+
+
+def iter_json_array(db, task_id, batch_size=1000):
+    """Stream the task's records exactly as ``dumps_pretty(get_scraped_data())``"""
+    records = db.get_scraped_records(task_id)
+    if not records:
+        yield '[]'
+        return
+
+    yield '['
+    for index, record in enumerate(records):
+        yield (',' if index else '') + '\n  {\n'
+        yield f'    "id": {dumps(record["id"])},\n'
+        yield f'    "data_type": {dumps(record["data_type"])},\n'
+        yield '    "data": '
+
+        if record['layout'] == 'list':
+            empty = True
+            for item in db.iter_record_items(record, batch_size):
+                yield ('[\n' if empty else ',\n') + _indent(dumps_pretty(item), ' ' * 6)
+                empty = False
+            yield '[]' if empty else '\n    ]'
+        else:
+            data = db.load_record_data(record)
+            yield dumps_pretty(data).replace('\n', '\n    ')
+
+        yield f',\n    "created_at": {dumps(record["created_at"])}\n  }}'
+    yield '\n]'
+
+
+def iter_ndjson(db, task_id, batch_size=1000):
+    """One compact JSON item per line"""
+    lines = []
+    for item in db.iter_scraped_items(task_id, batch_size=batch_size):
+        lines.append(dumps(item))
+        if len(lines) >= batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+# ---------------------------------------------------------------- responses
+
+_ACCEPT_RE = re.compile(r'\s*([^;,\s]+)\s*(?:;\s*q=([0-9.]+))?')
+
+# Body sizes of finished identity downloads by ETag, so a resumed download
+# knows the total length without generating the body twice
+_lengths = OrderedDict()
+_lengths_lock = threading.Lock()
+_MAX_LENGTHS = 256
+
+
+def negotiate_encoding(accept_encoding):
+    """Best of zstd/gzip the client accepts, or None for identity"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        match = _ACCEPT_RE.match(part)
+        if match:
+            accepted[match.group(1).lower()] = float(match.group(2) or 1)
+    if zstandard and accepted.get('zstd', 0) > 0:
+        return 'zstd'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def parse_range(header):
+    """``(first, last)`` of a single ``bytes=`` range (either may be None).
+
+    Multiple ranges and malformed headers give None: the range is ignored
+    and the full body is sent, as RFC 9110 allows.
+    """
+    match = re.fullmatch(r'bytes=\s*(\d*)-(\d*)\s*', (header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = (int(value) if value else None for value in match.groups())
+    if first is not None and last is not None and last < first:
+        return None
+    return first, last
+
+
+def resolve_range(byte_range, length):
+    """``(start, end)`` of a parsed range within ``length``, or None if unsatisfiable"""
+    first, last = byte_range
+    if first is None:
+        if not last:
+            return None
+        return max(length - last, 0), length - 1
+    if first >= length:
+        return None
+    return first, length - 1 if last is None else min(last, length - 1)
+
+
+def _slice(chunks, start, end):
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            yield chunk[max(start - position, 0):end + 1 - position]
+        position = chunk_end
+        if position > end:
+            return
+
+
+def _remember_length(etag, chunks):
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        yield chunk
+    with _lengths_lock:
+        _lengths[etag] = total
+        _lengths.move_to_end(etag)
+        while len(_lengths) > _MAX_LENGTHS:
+            _lengths.popitem(last=False)
+
+
+def _body_length(etag, make_body):
+    with _lengths_lock:
+        if etag in _lengths:
+            return _lengths[etag]
+    total = sum(len(chunk) for chunk in make_body())
+    with _lengths_lock:
+        _lengths[etag] = total
+    return total
+
+
+def export_response(make_body, filename, mimetype, etag, request):
+    """Streamed download of ``make_body()`` (an iterator of str chunks).
+
+    Compressed with zstd or gzip when the client accepts it; otherwise
+    single byte ranges are honoured so interrupted downloads can resume
+    (other Range headers are ignored).
+    ``etag`` must change whenever the body would; compressed responses get
+    it suffixed with the encoding.
+    """
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'ETag': f'"{etag}"',
+        'Vary': 'Accept-Encoding',
+    }
+
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding:
+        compress = zstd_chunks if encoding == 'zstd' else gzip_chunks
+        headers['Content-Encoding'] = encoding
+        # Different bytes from the identity body, so a different strong ETag
+        headers['ETag'] = f'"{etag}-{encoding}"'
+        return Response(compress(encode_chunks(make_body())), mimetype=mimetype, headers=headers)
+
+    headers['Accept-Ranges'] = 'bytes'
+    raw_body = lambda: encode_chunks(make_body())
+    byte_range = parse_range(request.headers.get('Range'))
+    if_range = request.headers.get('If-Range')
+    if byte_range and (not if_range or if_range.strip() == headers['ETag']):
+        length = _body_length(etag, raw_body)
+        resolved = resolve_range(byte_range, length)
+        if resolved is None:
+            headers['Content-Range'] = f'bytes */{length}'
+            return Response(status=416, headers=headers)
+        start, end = resolved
+        headers['Content-Range'] = f'bytes {start}-{end}/{length}'
+        headers['Content-Length'] = str(end - start + 1)
+        return Response(
+            _slice(raw_body(), start, end), status=206, mimetype=mimetype, headers=headers
+        )
+
+    with _lengths_lock:
+        length = _lengths.get(etag)
+    if length is not None:
+        headers['Content-Length'] = str(length)
+    return Response(_remember_length(etag, raw_body()), mimetype=mimetype, headers=headers)
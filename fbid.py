@@ -6,27 +6,41 @@ import random
 
 PER_AC_LIMIT = 200
 
-db = Database()
+# Enriched items are committed in batches of this size
+FLUSH_EVERY = 10
 
 logger = logging.getLogger(__name__)
 
-def enrich_fbid(session: str, data: list[dict], task_id: int):
+def enrich_fbid(
+    db: Database, session: str, data: list[dict], task_id: int, resume: bool = True
+) -> int:
+    """Add each user's fbid and append them to the task; returns the task's item count"""
     logger.info(f'Enriching fbid for {len(data)} users')
     logger.info(f'Using session: {session} for {task_id} | fbid')
+
+    if resume:
+        done = db.get_scraped_field_values(task_id, 'username')
+        if done:
+            logger.info(f'Resuming task {task_id}: skipping {len(done)} already enriched users')
+            data = [item for item in data if item['username'] not in done]
+
     scraper = Scraper(session)
-    new_data = []
-    for item in data:
-        item['fbid'] = scraper.get_profile(item['username'])['fbid']
-        new_data.append(item)
-
-        # update db
-        db.update_task_data(task_id, new_data)
-
-        # sleep
-        time.sleep(random.randint(10, 20))
-    accs = db.get_all_accounts()
-    for acc in accs:
-        if acc['username'] == session:
-            db.update_account_status(acc['id'], 'available')
-    return new_data
-        
\ No newline at end of file
+    pending = []
+    try:
+        for item in data:
+            item['fbid'] = scraper.get_profile(item['username'])['fbid']
+            pending.append(item)
+
+            # update db
+            if len(pending) >= FLUSH_EVERY:
+                db.append_scraped_items(task_id, 'fbid', pending)
+                pending = []
+
+            # sleep
+            time.sleep(random.randint(10, 20))
+    finally:
+        # Persist whatever was enriched, even if the loop failed part-way
+        if pending:
+            db.append_scraped_items(task_id, 'fbid', pending)
+
+    return db.count_scraped_items(task_id)
@@ -0,0 +1,141 @@
+import bisect
+import threading
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class HttpMetrics:
+    """Latency histogram and connection reuse across every pooled session"""
+
+    # Upper bounds of the latency buckets in milliseconds; the last bucket
+    # collects everything slower
+    BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions = weakref.WeakSet()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.requests = 0
+        self.total_ms = 0.0
+        # Pool counters of sessions that were already closed
+        self._closed_connections = 0
+        self._closed_requests = 0
+
+    def track(self, session: requests.Session) -> None:
+        with self._lock:
+            self._sessions.add(session)
+
+    def forget(self, session: requests.Session) -> None:
+        """Keep a closing session's pool counters in the totals"""
+        connections, pooled_requests = self._pool_counts(session)
+        with self._lock:
+            self._sessions.discard(session)
+            self._closed_connections += connections
+            self._closed_requests += pooled_requests
+
+    def observe(self, response, *args, **kwargs):
+        """requests response hook recording time to response headers"""
+        elapsed_ms = response.elapsed.total_seconds() * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+            self.requests += 1
+            self.total_ms += elapsed_ms
+        return response
+
+    @staticmethod
+    def _pool_counts(session):
+        connections = pooled_requests = 0
+        # One adapter is mounted for both schemes; count it once
+        adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            # urllib3's RecentlyUsedContainer refuses iteration, but keys()
+            # returns a locked snapshot
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    pooled_requests += pool.num_requests
+        return connections, pooled_requests
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions)
+            connections = self._closed_connections
+            pooled_requests = self._closed_requests
+            counts = list(self.counts)
+            total = self.requests
+            total_ms = self.total_ms
+        for session in sessions:
+            c, r = self._pool_counts(session)
+            connections += c
+            pooled_requests += r
+
+        labels = [f'<={ms}ms' for ms in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}ms']
+        return {
+            'sessions': len(sessions),
+            'requests': total,
+            'connections_opened': connections,
+            'connection_reuse_rate': (
+                round(1 - connections / pooled_requests, 3) if pooled_requests else 0
+            ),
+            'avg_latency_ms': round(total_ms / total, 1) if total else 0,
+            'latency_histogram': dict(zip(labels, counts)),
+        }
+
+
+http_metrics = HttpMetrics()
+
+
+def create_session(
+    headers: dict = None,
+    pool_size: int = Config.HTTP_POOL_SIZE,
+    retries: int = Config.HTTP_RETRIES,
+) -> requests.Session:
+    """Keep-alive session with a sized connection pool and connect retries.
+
+    Only connection failures (and one read failure) are retried; HTTP error
+    statuses such as 429 are returned to the caller, which knows whether to
+    back off or give up.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=1,
+        status=0,
+        other=0,
+        backoff_factor=0.5,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        "User-Agent": DEFAULT_USER_AGENT,
+        "Accept": "*/*",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    if headers:
+        session.headers.update(headers)
+    session.hooks['response'].append(http_metrics.observe)
+    http_metrics.track(session)
+    return session
+
+
+def close_session(session: requests.Session) -> None:
+    try:
+        http_metrics.forget(session)
+    finally:
+        session.close()
@@ -1,7 +1,15 @@
 import random
 from instagrapi import Client
+from instagrapi.exceptions import LoginRequired, ChallengeRequired
+from instagrapi.extractors import extract_comment, extract_user_short
+import inspect
 import logging
+import threading
 import time
+from collections import defaultdict
+from functools import wraps
+from config import Config
+from profile_cache import profile_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,23 +23,124 @@ class SessionInvalid(Exception):
         self.session_id = session_id
         super().__init__(f"Invalid session: {session_id}")
 
+class ClientCache:
+    """Process-wide cache of instagrapi clients keyed by session name.
+
+    Clients, and the HTTP connection pools they hold, are reused across
+    tasks. A session is only re-verified once ``ttl`` seconds have passed
+    since its last successful check, or after an auth error invalidated it.
+    """
+
+    def __init__(self, ttl: int = Config.SESSION_VERIFY_TTL) -> None:
+        self.ttl = ttl
+        self._entries = {}
+        self._session_locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verifications = 0
+        self.verify_seconds = 0.0
+
+    def get(self, session_name: str, proxy: str = None) -> Client:
+        with self._lock:
+            session_lock = self._session_locks[session_name]
+
+        with session_lock:
+            entry = self._entries.get(session_name)
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+            if entry is None:
+                cl = Client()
+                cl.load_settings(f'sessions/{session_name}.json')
+                cl.delay_range = [1, 3]
+                entry = {'client': cl, 'proxy': None, 'verified_at': None}
+                self._entries[session_name] = entry
+
+            cl = entry['client']
+            if proxy and proxy != entry['proxy']:
+                logger.info(f'Using proxy: {proxy}')
+                cl.set_proxy(proxy)
+                entry['proxy'] = proxy
+
+            verified_at = entry['verified_at']
+            if verified_at is None or time.monotonic() - verified_at > self.ttl:
+                if not self._verify(cl):
+                    logger.error("Session is invalid")
+                    self._entries.pop(session_name, None)
+                    raise SessionInvalid(session_name)
+                logger.info("Session is valid")
+                entry['verified_at'] = time.monotonic()
+
+            return cl
+
+    def invalidate(self, session_name: str) -> None:
+        """Force the next get() to re-verify the session"""
+        entry = self._entries.get(session_name)
+        if entry:
+            entry['verified_at'] = None
+
+    def _verify(self, cl: Client) -> bool:
+        start = time.perf_counter()
+        try:
+            cl.get_timeline_feed()
+            return True
+        except Exception:
+            return False
+        finally:
+            with self._lock:
+                self.verifications += 1
+                self.verify_seconds += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'clients': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'verifications': self.verifications,
+                'avg_verify_ms': (
+                    round(self.verify_seconds / self.verifications * 1000, 1)
+                    if self.verifications else 0
+                ),
+            }
+
+
+client_cache = ClientCache()
+
+
+def invalidate_on_auth_error(method):
+    """Drop the cached session's verification if Instagram rejects it"""
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def gen_wrapper(self, *args, **kwargs):
+            try:
+                yield from method(self, *args, **kwargs)
+            except (LoginRequired, ChallengeRequired):
+                client_cache.invalidate(self.session_name)
+                raise
+        return gen_wrapper
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except (LoginRequired, ChallengeRequired):
+            client_cache.invalidate(self.session_name)
+            raise
+    return wrapper
+
+
 class Scraper:
     def __init__(self, session_name: str, proxy: str = None) -> None:
         logger.info(f'Logging in with {session_name}...')
         self.session_name = session_name
-        self.cl = Client()
-        self.cl.load_settings(f'sessions/{session_name}.json')
-        self.cl.delay_range = [1, 3]
-
-        if proxy:
-            logger.info(f'Using proxy: {proxy}')
-            self.cl.set_proxy(proxy)
-
-        if self.verify_session():
-            logger.info("Session is valid")
-        else:
-            logger.error("Session is invalid")
-            raise SessionInvalid(session_name)
+        self.cl = client_cache.get(session_name, proxy)
 
     def verify_session(self):
         try:
@@ -40,7 +149,11 @@ class Scraper:
         except Exception:
             return False
 
+    @invalidate_on_auth_error
     def get_profile(self, username: str) -> dict:
+        return profile_cache.get_or_fetch('api', username, self._fetch_profile)
+
+    def _fetch_profile(self, username: str) -> dict:
         profile = self.cl.user_info_by_username(username)
 
         return {
@@ -56,94 +169,166 @@ class Scraper:
             'fbid': profile.interop_messaging_user_fbid,
         }
 
-    def get_comments(self, post_url: str, amount: int = 20) -> list:
+    @staticmethod
+    def _comments_params(result: dict):
+        """Params for the page after ``result``, following ``media_comments``"""
+        if result.get('has_more_comments') and result.get('next_max_id'):
+            return {'max_id': result['next_max_id']}
+        if result.get('has_more_headload_comments') and result.get('next_min_id'):
+            return {'min_id': result['next_min_id']}
+        return None
+
+    @invalidate_on_auth_error
+    def iter_comments(self, post_url: str, amount: int = 20, min_id: str = ""):
+        """Yield ``(commenters, cursor)`` page by page, stopping at ``amount``.
+
+        ``cursor`` is ``max_id:<id>`` or ``min_id:<id>`` (a bare id is read as
+        ``min_id``); pass it back as ``min_id`` to continue after that page.
+        It is empty once the comments, or ``amount``, are exhausted. Pages
+        are yielded whole, except the last one when it goes past ``amount``.
+        """
         logger.info(f'Fetching comments for : {post_url}')
-        media_pk = self.cl.media_pk_from_url(post_url)
-        comments = self.cl.media_comments(media_pk, amount=amount)
-        print(f'len of comments: {len(comments)}')
+        media_id = self.cl.media_id(self.cl.media_pk_from_url(post_url))
+        params = None
+        if min_id:
+            # Cursor values are often JSON, so only a known prefix is split off
+            name, _, value = min_id.partition(':')
+            params = {name: value} if name in ('max_id', 'min_id') else {'min_id': min_id}
+        fetched = 0
 
-        profiles = []
-        for comment in comments:
-            # user = (comment.user.username, comment.user.full_name)
-            user = {
-                'username': comment.user.username,
-                'full_name': comment.user.full_name,
-                'profile_pic_url': comment.user.profile_pic_url,
-                'is_private': comment.user.is_private,
-                # 'fbid': comment.user,
-            }
-            profiles.append(user)
+        while True:
+            result = self.cl.private_request(f'media/{media_id}/comments/', params=params)
+            comments = [extract_comment(comment) for comment in result.get('comments') or []]
+            params = self._comments_params(result)
+
+            if amount and fetched + len(comments) >= amount:
+                # Nothing is resumed past the requested amount, so trimming is safe
+                comments = comments[:amount - fetched]
+                params = None
 
-        logger.info(f'Fetched {len(profiles)} comments')
+            profiles = [
+                {
+                    'comment_id': str(comment.pk),
+                    'username': comment.user.username,
+                    'full_name': comment.user.full_name,
+                    'profile_pic_url': comment.user.profile_pic_url,
+                    'is_private': comment.user.is_private,
+                }
+                for comment in comments
+            ]
+            fetched += len(profiles)
 
+            cursor = ""
+            if params:
+                (name, value), = params.items()
+                cursor = f'{name}:{value}'
+            yield profiles, cursor
+
+            if not params or not result.get('comments'):
+                break
+
+        logger.info(f'Fetched {fetched} comments')
+
+    def get_comments(self, post_url: str, amount: int = 20) -> list:
+        profiles = []
+        for chunk, _ in self.iter_comments(post_url, amount):
+            profiles.extend(chunk)
         return profiles
 
-    def get_likes(self, post_url: str, amount: int = 20) -> list:
+    @invalidate_on_auth_error
+    def iter_likes(self, post_url: str, amount: int = 20, max_id: str = ""):
+        """Yield ``(likers, next_max_id)`` page by page, stopping at ``amount``"""
         logger.info(f'Fetching likes for : {post_url}')
-        media_pk = self.cl.media_pk_from_url(post_url)
-        likes = self.cl.media_likers(media_pk)
-        print(len(likes))
+        media_id = self.cl.media_id(self.cl.media_pk_from_url(post_url))
+        next_max_id = max_id
+        fetched = 0
 
-        profiles = []
-        for like in likes:
-            try:
-                profiles.append({
-                    "username": like.username,
-                    "full_name": like.full_name,
-                    "profile_pic_url": like.profile_pic_url,
-                    "is_private": like.is_private,
-                })
-            except Exception:
-                continue
-            if len(profiles) >= amount:
+        while fetched < amount:
+            params = {'max_id': next_max_id} if next_max_id else None
+            result = self.cl.private_request(f'media/{media_id}/likers/', params=params)
+            users = result.get('users', [])
+
+            profiles = []
+            for like in users[:amount - fetched]:
+                try:
+                    like = extract_user_short(like)
+                    profiles.append({
+                        "username": like.username,
+                        "full_name": like.full_name,
+                        "profile_pic_url": like.profile_pic_url,
+                        "is_private": like.is_private,
+                    })
+                except Exception:
+                    continue
+            fetched += len(profiles)
+            next_max_id = result.get('next_max_id') or ""
+
+            yield profiles, next_max_id
+
+            if not next_max_id or not users:
                 break
-        
-        logger.info(f'Fetched {len(profiles)} likes')
 
+        logger.info(f'Fetched {fetched} likes')
+
+    def get_likes(self, post_url: str, amount: int = 20) -> list:
+        profiles = []
+        for chunk, _ in self.iter_likes(post_url, amount):
+            profiles.extend(chunk)
         return profiles
 
-    def get_followers(self, username: str, amount: int = 20) -> list:
+    @invalidate_on_auth_error
+    def iter_followers(self, username: str, amount: int = 20, max_id: str = ""):
+        """Yield ``(followers, next_max_id)`` one page at a time.
+
+        ``next_max_id`` is the cursor to pass back as ``max_id`` to continue
+        after that page; it is empty once the list is exhausted.
+        """
         BATCH_AMOUNT = 100
 
         logger.info(f'Starting to fetch followers for {username}')
         user_id = self.cl.user_id_from_username(username)
-        next_max_id = "" # The "Cursor" - starts empty
-        followers = []
+        next_max_id = max_id
+        fetched = 0
 
-        while len(followers) < amount:
+        while fetched < amount:
             users_chunk, next_max_id = self.cl.user_followers_v1_chunk(
                 user_id, 
-                max_amount=min(amount, BATCH_AMOUNT), 
+                max_amount=min(amount - fetched, BATCH_AMOUNT), 
                 max_id=next_max_id
             )
             logger.info(f'Fetched {len(users_chunk)} followers')
 
-            followers.extend(
+            followers = [
                 {
                     'username': user.username, 
                     'full_name': user.full_name,
                     'profile_pic_url': user.profile_pic_url,
-                    'is_private': user,
+                    'is_private': user.is_private,
                 }
-                for user in users_chunk
-            )
+                for user in users_chunk[:amount - fetched]
+            ]
+            fetched += len(followers)
 
-            if len(followers) >= amount:
+            yield followers, next_max_id or ""
+
+            if fetched >= amount:
                 break
 
-            if not next_max_id:
+            if not next_max_id or not users_chunk:
                 break
 
             sleep_time = random.randint(15, 30)
             logger.info(f'Sleeping for {sleep_time} seconds')
             time.sleep(sleep_time)
 
+        logger.info(f'Fetched Total {fetched} followers for {username}')
 
-        logger.info(f'Fetched Total {len(followers)} followers for {username}')
-
+    def get_followers(self, username: str, amount: int = 20) -> list:
+        followers = []
+        for chunk, _ in self.iter_followers(username, amount):
+            followers.extend(chunk)
         return followers
 
-
 if __name__ == '__main__':
     # s = Scraper('itss.s.j')
     s = Scraper('gecko.11529752')
@@ -0,0 +1,118 @@
+"""JSON encode/decode with the fastest available backend.
+
+orjson (or msgspec for decoding) is used when installed and stdlib ``json``
+otherwise. Output keeps the stdlib semantics the callers relied on:
+unsupported values go through ``str()`` (datetimes included), enums are
+written as their value on every backend, non-string keys become strings,
+and anything the fast path rejects (NaN, integers wider than 64 bits) is
+handed to the stdlib instead, in both directions.
+"""
+import json
+import logging
+import re
+from enum import Enum
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _select_backend(name):
+    if name == 'orjson' and orjson is None:
+        logger.warning('orjson is not installed, falling back')
+        name = 'auto'
+    if name == 'msgspec' and msgspec is None:
+        logger.warning('msgspec is not installed, falling back')
+        name = 'auto'
+    if name == 'auto':
+        name = 'orjson' if orjson else 'msgspec' if msgspec else 'stdlib'
+    return name
+
+
+BACKEND = _select_backend(Config.JSON_BACKEND)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+# orjson decodes integers outside the 64-bit range as floats; text holding
+# such a literal (or a long digit run inside a string) is parsed by the stdlib
+_WIDE_INT_RE = re.compile(r'\d{20}|-\d{19}')
+_WIDE_INT_BYTES_RE = re.compile(rb'\d{20}|-\d{19}')
+
+
+def _default(obj):
+    # orjson writes enums as their value natively; do the same on the stdlib path
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def _has_nan(obj):
+    if isinstance(obj, float):
+        return obj != obj or obj in (float('inf'), float('-inf'))
+    if isinstance(obj, dict):
+        return any(_has_nan(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nan(v) for v in obj)
+    return False
+
+
+def _orjson_dumps(obj, option=0):
+    encoded = orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | option)
+    # orjson writes NaN/Infinity as null; only look for them when a null was written
+    if b'null' in encoded and _has_nan(obj):
+        raise TypeError('non-finite float')
+    return encoded.decode()
+
+
+def dumps(obj):
+    """Compact JSON text, stdlib ``json.dumps(obj, default=str)`` semantics (enums by value)"""
+    if BACKEND == 'orjson':
+        try:
+            return _orjson_dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_pretty(obj):
+    """Indented (2 spaces) JSON text for exports"""
+    if BACKEND == 'orjson':
+        try:
+            return _orjson_dumps(obj, orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(obj, default=_default, indent=2, ensure_ascii=False)
+
+
+def loads(data):
+    """Parse JSON text or bytes"""
+    if data is None:
+        return None
+    try:
+        if BACKEND == 'orjson':
+            wide = _WIDE_INT_BYTES_RE if isinstance(data, (bytes, bytearray)) else _WIDE_INT_RE
+            if not wide.search(data):
+                return orjson.loads(data)
+        if BACKEND == 'msgspec':
+            return msgspec.json.decode(data)
+    except Exception:
+        # NaN/Infinity literals written by the stdlib encoder; the stdlib
+        # either accepts them or raises the usual JSONDecodeError
+        pass
+    return json.loads(data)
@@ -0,0 +1,253 @@
+"""Columnar (Arrow/Parquet) export of flattened task rows.
+
+Rows come from ``DataFormatter.iter_rows`` and are converted to Arrow record
+batches with a typed schema per task type, so counts stay integers, flags
+stay booleans and ``scraped_at`` is a real timestamp. Needs pyarrow; ``pa``
+is None when it is not installed.
+"""
+import os
+from datetime import datetime
+
+from data_formatter import DataFormatter
+from json_codec import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Rows buffered per Parquet row group; small flattener chunks would
+# otherwise each become a tiny, badly compressed row group
+ROW_GROUP_ROWS = 64 * 1024
+
+INT_COLUMNS = {
+    'index', 'post_number', 'comment_number',
+    'followers_count', 'following_count', 'posts_count',
+    'highlight_reel_count', 'igtv_video_count',
+    'post_likes_count', 'post_comments_count', 'post_video_views',
+    'post_dimensions_height', 'post_dimensions_width', 'post_child_count',
+    'hashtags_count', 'mentions_count', 'tagged_users_count',
+    'likes_count', 'comments_count',
+}
+BOOL_COLUMNS = {'has_channel', 'joined_recently'}
+TIMESTAMP_COLUMNS = {'scraped_at', 'post_timestamp'}
+
+# fbid tasks keep the rows of their source task plus an ``fbid`` column
+FBID_COLUMNS = [
+    'username', 'full_name', 'fbid', 'profile_url', 'profile_pic_url',
+    'is_verified', 'is_private', 'comment_id', 'scraped_at',
+]
+
+
+def column_type(name):
+    """Arrow type of a flattened column, by name"""
+    if name in INT_COLUMNS:
+        return pa.int64()
+    if name in BOOL_COLUMNS or name.startswith('is_') or '_is_' in name:
+        return pa.bool_()
+    if name in TIMESTAMP_COLUMNS:
+        return pa.timestamp('s')
+    return pa.string()
+
+
+def column_order(task_type):
+    if task_type == 'fbid':
+        return FBID_COLUMNS
+    return DataFormatter.get_column_order(task_type)
+
+
+def schema_for(task_type, rows=None):
+    """Schema of ``task_type``: its known columns, plus any other keys of ``rows``.
+
+    Known columns missing from ``rows`` are dropped, as in the CSV export;
+    with no rows the full known column set is used. Only the keys of the
+    rows passed in are considered.
+    """
+    order = column_order(task_type)
+    if rows:
+        present = {}
+        for row in rows:
+            present.update(dict.fromkeys(row))
+        names = [c for c in order if c in present]
+        names += [c for c in present if c not in names]
+    else:
+        names = list(order)
+    return pa.schema([(name, column_type(name)) for name in names])
+
+
+# ---------------------------------------------------------------- coercion
+
+def _to_int(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (bool, int)):
+        return int(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _to_bool(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes'):
+        return True
+    if text in ('false', '0', 'no'):
+        return False
+    return None
+
+
+def _to_timestamp(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _to_string(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return dumps(value)
+    return str(value)
+
+
+def _converter(arrow_type):
+    if pa.types.is_integer(arrow_type):
+        return _to_int
+    if pa.types.is_boolean(arrow_type):
+        return _to_bool
+    if pa.types.is_timestamp(arrow_type):
+        return _to_timestamp
+    return _to_string
+
+
+def to_record_batch(rows, schema):
+    """One Arrow record batch of ``rows``; keys outside ``schema`` are ignored"""
+    arrays = []
+    for field in schema:
+        convert = _converter(field.type)
+        name = field.name
+        arrays.append(pa.array([convert(row.get(name)) for row in rows], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_record_batches(task_type, row_chunks, schema=None):
+    """Record batches for a stream of flattened row chunks.
+
+    The schema is fixed by the first non-empty chunk unless given, so keys
+    first appearing in a later chunk are dropped; pass ``schema`` (see
+    ``scan_schema``) when the rows can be read twice.
+    """
+    for rows in row_chunks:
+        if not rows:
+            continue
+        if schema is None:
+            schema = schema_for(task_type, rows)
+        yield to_record_batch(rows, schema)
+
+
+# ---------------------------------------------------------------- writers
+
+def scan_schema(task_type, row_chunks):
+    """Schema covering every key of ``row_chunks``, read once without keeping rows"""
+    keys = {}
+    for rows in row_chunks:
+        for row in rows:
+            keys.update(dict.fromkeys(row))
+    return schema_for(task_type, [keys] if keys else None)
+
+
+def write_parquet(sink, task_type, row_chunks, compression='zstd', schema=None):
+    """Write row chunks to ``sink`` (a path or binary file) as Parquet.
+
+    Batches are flushed one row group at a time, so memory stays bounded by
+    ``ROW_GROUP_ROWS``. Without ``schema`` the columns come from the first
+    chunk (see ``iter_record_batches``). Returns the number of rows written.
+    """
+    writer = None
+    pending = []
+    pending_rows = 0
+    total = 0
+
+    def flush():
+        writer.write_table(pa.Table.from_batches(pending), row_group_size=ROW_GROUP_ROWS)
+        pending.clear()
+
+    try:
+        for batch in iter_record_batches(task_type, row_chunks, schema):
+            if writer is None:
+                writer = pq.ParquetWriter(sink, batch.schema, compression=compression)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            total += batch.num_rows
+            if pending_rows >= ROW_GROUP_ROWS:
+                flush()
+                pending_rows = 0
+
+        if writer is None:
+            # No rows: still write a valid file carrying the task type's schema
+            writer = pq.ParquetWriter(
+                sink, schema or schema_for(task_type), compression=compression
+            )
+        elif pending:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def task_row_chunks(db, task, batch_size=1000):
+    return DataFormatter.iter_rows(
+        task['task_type'], db.iter_scraped_items(task['id'], batch_size=batch_size),
+        chunk_size=batch_size
+    )
+
+
+def write_task_parquet(db, task, sink, batch_size=1000):
+    """Write the task's rows as Parquet.
+
+    The rows are flattened twice: once to collect every key for the schema
+    and once to write them, so keys that only appear late are kept.
+    """
+    schema = scan_schema(task['task_type'], task_row_chunks(db, task, batch_size))
+    return write_parquet(
+        sink, task['task_type'], task_row_chunks(db, task, batch_size), schema=schema
+    )
+
+
+def write_dataset(db, tasks, base_dir, batch_size=1000):
+    """Write several tasks as one hive-partitioned Parquet dataset.
+
+    Files go to ``task_type=<type>/task_id=<id>/part-0.parquet`` under
+    ``base_dir``; each task type directory reads back as a single table
+    with ``pyarrow.dataset.dataset(path, partitioning='hive')``.
+    Returns the relative paths written.
+    """
+    paths = []
+    for task in tasks:
+        relative = os.path.join(
+            f"task_type={task['task_type']}", f"task_id={task['id']}", 'part-0.parquet'
+        )
+        path = os.path.join(base_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_task_parquet(db, task, path, batch_size)
+        paths.append(relative)
+    return paths
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config import Config
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCache:
+    """TTL cache of username -> profile, shared by every profile lookup.
+
+    Entries are namespaced by ``kind`` ('web' for the web_profile_info
+    endpoint, 'api' for instagrapi) because the two return different
+    shapes. The in-memory LRU sits in front of an optional SQLite table so
+    repeat targets are served across tasks and restarts. Expired rows are
+    purged from the table every ``purge_every`` writes.
+    """
+
+    def __init__(
+        self,
+        ttl: int = Config.PROFILE_CACHE_TTL,
+        max_entries: int = Config.PROFILE_CACHE_SIZE,
+        db: Database = None,
+        purge_every: int = 500,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db = db
+        self.purge_every = purge_every
+        self._entries = OrderedDict()
+        # key -> [lock, users]; entries go away once nobody holds or waits
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def use_database(self, db: Database) -> None:
+        """Persist entries through ``db`` (the app's Database), dropping expired ones"""
+        self.db = db
+        self.purge()
+
+    def get(self, kind: str, username: str):
+        """Cached profile for ``username`` or None"""
+        key = (kind, username.lower())
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+
+        if self.db:
+            try:
+                cached = self.db.get_cached_profile(kind, key[1], self.ttl)
+            except Exception as e:
+                logger.warning(f'Profile cache lookup failed: {e}')
+                cached = None
+            if cached:
+                profile, fetched_at = cached
+                self._store(key, profile, fetched_at)
+                with self._lock:
+                    self.db_hits += 1
+                return dict(profile)
+        return None
+
+    def set(self, kind: str, username: str, profile: dict) -> None:
+        key = (kind, username.lower())
+        fetched_at = time.time()
+        self._store(key, profile, fetched_at)
+        if self.db:
+            try:
+                self.db.save_cached_profile(kind, key[1], profile, fetched_at)
+            except Exception as e:
+                logger.warning(f'Profile cache write failed: {e}')
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % self.purge_every == 0
+            if purge:
+                self.purge()
+
+    def purge(self) -> int:
+        """Delete persisted entries older than ``ttl``"""
+        try:
+            return self.db.purge_cached_profiles(self.ttl)
+        except Exception as e:
+            logger.warning(f'Profile cache purge failed: {e}')
+            return 0
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def get_or_fetch(self, kind: str, username: str, fetch):
+        """Return the cached profile, calling ``fetch(username)`` on a miss.
+
+        Concurrent misses for the same user wait for a single fetch. Failed
+        lookups (None) are not cached.
+        """
+        profile = self.get(kind, username)
+        if profile is not None:
+            return profile
+
+        with self._key_lock((kind, username.lower())):
+            profile = self.get(kind, username)
+            if profile is not None:
+                return profile
+            with self._lock:
+                self.misses += 1
+            profile = fetch(username)
+            if profile:
+                self.set(kind, username, profile)
+            return profile
+
+    def _store(self, key, profile, fetched_at) -> None:
+        with self._lock:
+            self._entries[key] = (fetched_at, profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0,
+            }
+
+
+# Memory only until the app attaches its database with use_database()
+profile_cache = ProfileCache()
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
+
+from config import Config
+from data_formatter import DataFormatter
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class RowCache:
+    """Flattened table rows of each task, materialized in SQLite.
+
+    Rows are built once (when a task completes, or on the first view) and
+    served from ``task_rows`` afterwards. Every write to a task's scraped
+    data bumps ``tasks.data_rev``, which makes the stored rows stale and the
+    next lookup rebuilds them. A running task writes every page, so its
+    rows are only rebuilt once they are ``refresh_seconds`` old.
+    """
+
+    def __init__(
+        self, db: Database, chunk_size: int = 1000,
+        refresh_seconds: int = Config.ROW_CACHE_REFRESH_SECONDS
+    ) -> None:
+        self.db = db
+        self.chunk_size = chunk_size
+        self.refresh_seconds = refresh_seconds
+        # task id -> [lock, users]; entries go away once nobody holds or waits
+        self._task_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    @staticmethod
+    def table_columns(task_type: str, first_row: dict) -> list:
+        """Columns shown for a task type: its preferred order, or the first row's keys"""
+        columns = DataFormatter.get_column_order(task_type)
+        if not columns and first_row:
+            columns = list(first_row.keys())
+        return columns
+
+    @contextmanager
+    def _task_lock(self, task_id):
+        with self._lock:
+            entry = self._task_locks.setdefault(task_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._task_locks[task_id]
+
+    def materialize(self, task: dict) -> dict:
+        """(Re)build the task's rows from its scraped items and return the row set"""
+        task_id = task['id']
+        start = time.perf_counter()
+        # Read the revision first: writes landing during the build leave it stale
+        data_rev = self.db.get_data_rev(task_id)
+
+        items = self.db.iter_scraped_items(task_id, batch_size=self.chunk_size)
+        chunks = DataFormatter.iter_rows(task['task_type'], items, self.chunk_size)
+        # The column list needs the first row, so pull one chunk before storing
+        head = next(chunks, [])
+        columns = self.table_columns(task['task_type'], head[0] if head else {})
+
+        build, row_count = self.db.replace_task_rows(
+            task_id, data_rev, columns, chain([head], chunks)
+        )
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+        logger.info(f'Materialized {row_count} row(s) of task #{task_id} in {elapsed:.2f}s')
+        return {
+            'task_id': task_id, 'data_rev': data_rev, 'build': build,
+            'columns': columns, 'row_count': row_count,
+        }
+
+    def _usable(self, task: dict, row_set, exact: bool) -> bool:
+        if row_set is None:
+            return False
+        if row_set['current']:
+            return True
+        return (
+            not exact and task['status'] == 'running'
+            and row_set['age_seconds'] < self.refresh_seconds
+        )
+
+    def get_row_set(self, task: dict, exact: bool = False) -> dict:
+        """The task's row set, building it on a miss.
+
+        Unless ``exact``, a running task's rows are reused while younger
+        than ``refresh_seconds`` even if its data moved on since.
+        """
+        row_set = self.db.get_row_set(task['id'])
+        if self._usable(task, row_set, exact):
+            with self._lock:
+                self.hits += 1
+            return row_set
+
+        with self._task_lock(task['id']):
+            # Another request may have built it while we waited
+            row_set = self.db.get_row_set(task['id'])
+            usable = self._usable(task, row_set, exact)
+            with self._lock:
+                if usable:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if not usable:
+                row_set = self.materialize(task)
+            return row_set
+
+    def iter_row_chunks(self, task: dict):
+        """Iterator over the task's current rows in chunks, building them first if needed"""
+        row_set = self.get_row_set(task, exact=True)
+        return self.db.iter_task_rows(task['id'], row_set['build'], self.chunk_size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'builds': self.builds,
+                'avg_build_ms': (
+                    round(self.build_seconds / self.builds * 1000, 1) if self.builds else 0
+                ),
+            }
+
@@ -15,17 +15,45 @@ import requests
 import json
 import re
 import uuid
+import socket
 from datetime import datetime
-from urllib.parse import quote
 from config import Config
+from profile_cache import profile_cache
+from http_client import create_session, close_session
+from contact_extractor import extract_contacts, find_emails, find_phones
+from json_codec import loads
+
+
+def free_port():
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
 
 
 class InstagramScraper:
-    def __init__(self):
+    # URL patterns blocked over CDP in lean mode (media and web fonts). The
+    # wildcards match the whole URL and CDN URLs carry query strings, hence
+    # the trailing '*'
+    LEAN_BLOCKED_URLS = [
+        '*.mp4*', '*.m4v*', '*.m4a*', '*.webm*', '*.mp3*',
+        '*.woff*', '*.ttf*', '*.otf*',
+    ]
+
+    def __init__(self, debug_port=None, profile_dir=None, lean=None):
         self.driver = None
         self.is_logged_in = False
         self.current_account = None
         self.instagram_app_id = "936619743392459"
+        # Each instance gets its own debugging port and (optionally) profile
+        # dir so several browsers can run side by side
+        self.debug_port = debug_port or free_port()
+        self.profile_dir = profile_dir
+        self.lean = Config.LEAN_BROWSER if lean is None else lean
+        self.pacing_floor = Config.PACING_FLOOR
+        self._last_action = 0.0
+        self._http = None
+        self.reset_page_metrics()
 
     # ===================== COMMON HELPERS =====================
 
@@ -49,7 +77,7 @@ class InstagramScraper:
 
             # MacOS specific fixes
             options.add_argument('--disable-dev-tools')
-            options.add_argument('--remote-debugging-port=9222')
+            options.add_argument(f'--remote-debugging-port={self.debug_port}')
 
             # Headless mode - can be controlled via environment variable
             if os.getenv('HEADLESS', 'true').lower() == 'true':
@@ -63,11 +91,33 @@ class InstagramScraper:
             ]
             options.add_argument(f'user-agent={random.choice(user_agents)}')
 
+            # Lean mode: skip downloads the scrapers never look at
+            if self.lean:
+                options.add_experimental_option('prefs', {
+                    'profile.managed_default_content_settings.images': 2,
+                    'profile.default_content_setting_values.notifications': 2,
+                })
+                for flag in (
+                    '--disable-background-networking',
+                    '--disable-component-update',
+                    '--disable-default-apps',
+                    '--disable-domain-reliability',
+                    '--disable-sync',
+                    '--metrics-recording-only',
+                    '--mute-audio',
+                    '--no-first-run',
+                ):
+                    options.add_argument(flag)
+
             # Initialize driver with version management
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+
             self.driver = uc.Chrome(
                 options=options,
                 version_main=None,  # Auto-detect Chrome version
-                driver_executable_path=None
+                driver_executable_path=None,
+                user_data_dir=self.profile_dir
             )
 
             self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
@@ -76,7 +126,13 @@ class InstagramScraper:
             # Verify window is accessible
             _ = self.driver.current_url
 
-            print('✅ Chrome driver initialized successfully')
+            if self.lean:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd(
+                    'Network.setBlockedURLs', {'urls': self.LEAN_BLOCKED_URLS}
+                )
+
+            print(f"✅ Chrome driver initialized successfully{' (lean mode)' if self.lean else ''}")
             return self.driver
 
         except Exception as e:
@@ -99,51 +155,338 @@ class InstagramScraper:
         except (WebDriverException, NoSuchWindowException):
             return False
 
+    @property
+    def http(self):
+        """Keep-alive requests session shared by every API call of this scraper"""
+        if self._http is None:
+            self._http = create_session({"x-ig-app-id": self.instagram_app_id})
+            if self.is_driver_alive():
+                self.sync_http_cookies()
+        return self._http
+
+    def sync_http_cookies(self):
+        """Copy the browser's cookies and user agent into the HTTP session"""
+        session = self.http
+        cookies = self.driver.get_cookies()
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'])
+        session.headers["User-Agent"] = self.driver.execute_script("return navigator.userAgent")
+        return {c['name']: c['value'] for c in cookies}
+
+    # Navigation timing and transfer sizes of the current page. Resource
+    # timings are cleared after reading so a page is never counted twice.
+    PAGE_METRICS_JS = """
+        const nav = performance.getEntriesByType('navigation')[0];
+        let bytes = 0;
+        for (const entry of performance.getEntriesByType('resource')) {
+            bytes += entry.transferSize || 0;
+        }
+        let loadMs = null;
+        if (nav && !window.__igLoadCounted) {
+            bytes += nav.transferSize || 0;
+            loadMs = nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null;
+            window.__igLoadCounted = true;
+        }
+        performance.clearResourceTimings();
+        performance.setResourceTimingBufferSize(5000);
+        return {bytes: bytes, load_ms: loadMs};
+    """
+
+    def reset_page_metrics(self):
+        self.page_metrics = {
+            'lean': self.lean,
+            'pages': 0,
+            'page_load_ms': 0,
+            'transfer_bytes': 0,
+            'content_wait_seconds': 0.0,
+            'pacing_seconds': 0.0,
+        }
+
+    def record_page_metrics(self):
+        """Add the current page's load time and transferred bytes to page_metrics"""
+        try:
+            sample = self.driver.execute_script(self.PAGE_METRICS_JS)
+        except Exception:
+            return
+        if not sample:
+            return
+        self.page_metrics['transfer_bytes'] += int(sample.get('bytes') or 0)
+        if sample.get('load_ms') is not None:
+            self.page_metrics['pages'] += 1
+            self.page_metrics['page_load_ms'] += int(sample['load_ms'])
+
+    def navigate(self, url):
+        """Load ``url`` after recording metrics for the page being left"""
+        if self.driver.current_url.startswith('http'):
+            self.record_page_metrics()
+        self.driver.get(url)
+
+    def js_heap_mb(self):
+        """Used JS heap of the current page in MB, or None if unavailable"""
+        try:
+            used = self.driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null"
+            )
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
     def human_delay(self, min_delay=None, max_delay=None):
         """Add random delay to mimic human behavior"""
         min_d = min_delay or Config.REQUEST_DELAY_MIN
         max_d = max_delay or Config.REQUEST_DELAY_MAX
         time.sleep(random.uniform(min_d, max_d))
 
+    def set_pacing(self, pacing_floor=None):
+        """Use the account's pacing floor, or the configured default"""
+        self.pacing_floor = Config.PACING_FLOOR if pacing_floor is None else pacing_floor
+
+    def pace(self):
+        """Keep at least ``pacing_floor`` (plus jitter) between page actions.
+
+        Time already spent waiting for content counts towards the floor, so
+        this only sleeps when the page answered faster than the floor.
+        """
+        target = random.uniform(self.pacing_floor, self.pacing_floor * 1.5)
+        remaining = target - (time.monotonic() - self._last_action)
+        if remaining > 0:
+            time.sleep(remaining)
+            self.page_metrics['pacing_seconds'] = round(
+                self.page_metrics['pacing_seconds'] + remaining, 3)
+        self._last_action = time.monotonic()
+
+    def wait_for(self, condition, timeout=None):
+        """Wait until ``condition(driver)`` is truthy; False on timeout"""
+        start = time.monotonic()
+        try:
+            return WebDriverWait(
+                self.driver, timeout or Config.SCROLL_WAIT_TIMEOUT, poll_frequency=0.25
+            ).until(condition)
+        except TimeoutException:
+            return False
+        finally:
+            self.page_metrics['content_wait_seconds'] = round(
+                self.page_metrics['content_wait_seconds'] + time.monotonic() - start, 3)
+
+    def wait_for_page(self):
+        """Wait for the document to finish loading, then pace"""
+        self.wait_for(
+            lambda d: d.execute_script("return document.readyState") == 'complete',
+            Config.PAGE_LOAD_TIMEOUT
+        )
+        self.pace()
+
+    # Candidate username nodes inside a followers/following/likes dialog,
+    # tried in order until one matches
+    DIALOG_USERNAME_SELECTORS = [
+        "//div[@role='dialog']//a[contains(@href, '/')]/span",
+        "//div[@role='dialog']//span[contains(@class, 'x')]//span",
+    ]
+
+    DIALOG_SCROLL_SELECTORS = [
+        "//div[@role='dialog']//div[contains(@style, 'overflow')]",
+        "//div[@role='dialog']//div[contains(@class, 'x')]//div[contains(@style, 'height')]",
+        "//div[@role='dialog']//ul/parent::div",
+    ]
+
+    # Reads every new username row in one round trip. Rows already returned
+    # are tagged with data-ig-seen so later passes skip them.
+    EXTRACT_DIALOG_USERS_JS = """
+        const selectors = arguments[0];
+        let nodes = [];
+        for (const xpath of selectors) {
+            const snapshot = document.evaluate(
+                xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            if (snapshot.snapshotLength) {
+                for (let i = 0; i < snapshot.snapshotLength; i++) {
+                    nodes.push(snapshot.snapshotItem(i));
+                }
+                break;
+            }
+        }
+        const rows = [];
+        for (const node of nodes) {
+            if (node.dataset.igSeen) continue;
+            const text = (node.innerText || '').trim();
+            if (!text) continue;
+            node.dataset.igSeen = '1';
+            const link = node.closest('a');
+            rows.push({username: text, href: link ? link.href : null});
+        }
+        return rows;
+    """
+
+    def extract_dialog_users(self, seen_usernames, limit):
+        """Return new ``{username, profile_url, scraped_at}`` rows from the open dialog"""
+        rows = self.driver.execute_script(
+            self.EXTRACT_DIALOG_USERS_JS, self.DIALOG_USERNAME_SELECTORS
+        ) or []
+
+        users = []
+        for row in rows:
+            username_text = row.get('username', '')
+            if username_text in seen_usernames:
+                continue
+            if ' ' in username_text or len(username_text) > 30:
+                continue
+            seen_usernames.add(username_text)
+            users.append({
+                'username': username_text,
+                'profile_url': row.get('href') or f"{Config.INSTAGRAM_URL}/{username_text}/",
+                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            if len(users) >= limit:
+                break
+        return users
+
+    # Height and row count of a scroll container; a change means new rows
+    # were rendered after scrolling
+    SCROLL_STATE_JS = """
+        const el = arguments[0];
+        return [el.scrollHeight, el.querySelectorAll('a').length];
+    """
+
+    def scroll_dialog_users(self, modal, max_items, label):
+        """Scroll the open user-list dialog and collect up to ``max_items`` users"""
+        users = []
+        seen_usernames = set()
+        scroll_attempts = 0
+        max_scroll_attempts = 200
+        no_change_count = 0
+        stalled = 0
+
+        scrollable_element = None
+        for selector in self.DIALOG_SCROLL_SELECTORS:
+            try:
+                scrollable_element = self.driver.find_element(By.XPATH, selector)
+                if scrollable_element:
+                    print("✅ Found scrollable element")
+                    break
+            except Exception:
+                continue
+
+        if not scrollable_element:
+            scrollable_element = modal
+
+        while len(users) < max_items and scroll_attempts < max_scroll_attempts:
+            try:
+                new_users = self.extract_dialog_users(seen_usernames, max_items - len(users))
+                users.extend(new_users)
+
+                if not new_users:
+                    no_change_count += 1
+                    if no_change_count >= 10:
+                        print(f"⚠️ No new {label} found after 10 scroll attempts")
+                        break
+                else:
+                    no_change_count = 0
+
+            except Exception as e:
+                print(f"⚠️ Error finding {label}: {str(e)}")
+
+            if len(users) >= max_items:
+                break
+
+            try:
+                before = self.driver.execute_script(self.SCROLL_STATE_JS, scrollable_element)
+                self.pace()
+                self.driver.execute_script(
+                    "arguments[0].scrollTop = arguments[0].scrollHeight",
+                    scrollable_element
+                )
+                grew = self.wait_for(
+                    lambda d: d.execute_script(self.SCROLL_STATE_JS, scrollable_element) != before
+                )
+                print(f"📜 Scrolling... Found {len(users)} {label} so far")
+                # Nothing rendered within the timeout several times running:
+                # the list is exhausted
+                stalled = 0 if grew else stalled + 1
+                if stalled >= 3:
+                    print(f"⚠️ No new {label} loaded after {stalled} scrolls")
+                    break
+            except Exception as e:
+                print(f"⚠️ Scroll error: {str(e)}")
+
+            scroll_attempts += 1
+
+        return users
+
+    # Returns post anchors that appeared since the previous call. Anchors are
+    # only tagged once their thumbnail has rendered, so late images are
+    # picked up on a later scroll.
+    EXTRACT_NEW_POSTS_JS = """
+        const rows = [];
+        for (const link of document.querySelectorAll('a[href*="/p/"]')) {
+            if (link.dataset.igSeen) continue;
+            const img = link.querySelector('img');
+            if (!img) continue;
+            link.dataset.igSeen = '1';
+            rows.push({href: link.href, src: img.src, alt: img.alt});
+        }
+        return rows;
+    """
+
+    POST_SHORTCODE_RE = re.compile(r'/p/([^/?#]+)')
+
+    def scroll_posts(self, max_posts, make_row):
+        """Scroll a post grid, building one row per unique shortcode.
+
+        Each pass only looks at anchors added since the previous scroll, so
+        the work grows linearly with the number of posts loaded.
+        """
+        posts_data = []
+        seen_shortcodes = set()
+        body = self.driver.find_element(By.TAG_NAME, 'body')
+
+        while len(posts_data) < max_posts:
+            for link in self.driver.execute_script(self.EXTRACT_NEW_POSTS_JS) or []:
+                match = self.POST_SHORTCODE_RE.search(link.get('href') or '')
+                if not match or match.group(1) in seen_shortcodes:
+                    continue
+                seen_shortcodes.add(match.group(1))
+                posts_data.append(make_row(link))
+                if len(posts_data) >= max_posts:
+                    break
+
+            if len(posts_data) >= max_posts:
+                break
+
+            before = self.driver.execute_script(self.SCROLL_STATE_JS, body)
+            self.pace()
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            if not self.wait_for(lambda d: d.execute_script(self.SCROLL_STATE_JS, body) != before):
+                break
+
+        return posts_data
+
     def extract_emails_from_bio(self, text):
-        if not text:
-            return []
-        return re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
+        return find_emails(text)
 
     def extract_phones_from_bio(self, text):
-        if not text:
-            return []
-        pattern = r'\+?\d{1,4}?[-.\s]?\(?\d{1,3}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}'
-        return re.findall(pattern, text)
+        return find_phones(text)
 
     # ===================== PROFILE (API) =====================
 
     def scrape_profile_api(self, username):
         """
         Scrape comprehensive Instagram profile data using Instagram's API
-        This method doesn't require authentication and is much faster
+        This method doesn't require authentication and is much faster.
+        Results are served from the shared profile cache when fresh.
         """
-        url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
+        return profile_cache.get_or_fetch('web', username, self._fetch_profile_api)
 
-        headers = {
-            "x-ig-app-id": self.instagram_app_id,
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-        }
+    def _fetch_profile_api(self, username):
+        url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
 
         try:
             print(f"📊 Scraping profile via API: {username}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, timeout=Config.HTTP_TIMEOUT)
 
             if response.status_code != 200:
                 print(f"❌ API request failed with status {response.status_code}")
                 return None
 
-            data = response.json()
+            data = loads(response.content)
             user = data.get('data', {}).get('user', {})
 
             if not user:
@@ -151,8 +494,7 @@ class InstagramScraper:
                 return None
 
             bio = user.get("biography", "") or ""
-            bio_emails = self.extract_emails_from_bio(bio)
-            bio_phones = self.extract_phones_from_bio(bio)
+            bio_emails, bio_phones = extract_contacts(bio)
 
             full_name = user.get("full_name", "").strip()
             parts = full_name.split(" ", 1)
@@ -325,7 +667,7 @@ class InstagramScraper:
 
             # Navigate to login page with error handling
             try:
-                self.driver.get(Config.INSTAGRAM_LOGIN_URL)
+                self.navigate(Config.INSTAGRAM_LOGIN_URL)
             except WebDriverException as e:
                 print(f"❌ Failed to navigate to login page: {str(e)}")
                 return False
@@ -432,8 +774,8 @@ class InstagramScraper:
         try:
             profile_url = f"{Config.INSTAGRAM_URL}/{username}/"
             print(f"📊 Scraping profile via Selenium: {username}")
-            self.driver.get(profile_url)
-            self.human_delay(3, 5)
+            self.navigate(profile_url)
+            self.wait_for_page()
 
             profile_data = {
                 'username': username,
@@ -503,44 +845,15 @@ class InstagramScraper:
         try:
             profile_url = f"{Config.INSTAGRAM_URL}/{username}/"
             print(f"📸 Scraping posts from {username}")
-            self.driver.get(profile_url)
-            self.human_delay(3, 5)
-
-            posts_data = []
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            posts_loaded = 0
-
-            while posts_loaded < max_posts:
-                post_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/p/')]")
+            self.navigate(profile_url)
+            self.wait_for_page()
 
-                for link in post_links[:max_posts]:
-                    if posts_loaded >= max_posts:
-                        break
-
-                    try:
-                        post_url = link.get_attribute('href')
-                        img = link.find_element(By.TAG_NAME, 'img')
-                        img_src = img.get_attribute('src')
-                        alt_text = img.get_attribute('alt')
-
-                        posts_data.append({
-                            'post_url': post_url,
-                            'image_url': img_src,
-                            'caption_preview': alt_text[:100] if alt_text else 'N/A',
-                            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                        })
-                        posts_loaded += 1
-
-                    except Exception:
-                        continue
-
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                self.human_delay(2, 4)
-
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            posts_data = self.scroll_posts(max_posts, lambda link: {
+                'post_url': link['href'],
+                'image_url': link['src'],
+                'caption_preview': link['alt'][:100] if link.get('alt') else 'N/A',
+                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
 
             print(f"✅ Scraped {len(posts_data)} posts from {username}")
             return posts_data
@@ -562,43 +875,15 @@ class InstagramScraper:
             clean_tag = hashtag.replace('#', '')
             hashtag_url = f"{Config.INSTAGRAM_URL}/explore/tags/{clean_tag}/"
             print(f"#️⃣ Scraping hashtag: #{clean_tag}")
-            self.driver.get(hashtag_url)
-            self.human_delay(3, 5)
-
-            posts_data = []
-            posts_loaded = 0
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-
-            while posts_loaded < max_posts:
-                post_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/p/')]")
-
-                for link in post_links[:max_posts]:
-                    if posts_loaded >= max_posts:
-                        break
-
-                    try:
-                        post_url = link.get_attribute('href')
-                        img = link.find_element(By.TAG_NAME, 'img')
-                        img_src = img.get_attribute('src')
-
-                        posts_data.append({
-                            'post_url': post_url,
-                            'image_url': img_src,
-                            'hashtag': f"#{clean_tag}",
-                            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                        })
-                        posts_loaded += 1
-
-                    except Exception:
-                        continue
+            self.navigate(hashtag_url)
+            self.wait_for_page()
 
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                self.human_delay(2, 4)
-
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            posts_data = self.scroll_posts(max_posts, lambda link: {
+                'post_url': link['href'],
+                'image_url': link['src'],
+                'hashtag': f"#{clean_tag}",
+                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
 
             print(f"✅ Scraped {len(posts_data)} posts from #{clean_tag}")
             return posts_data
@@ -620,8 +905,8 @@ class InstagramScraper:
         try:
             profile_url = f"{Config.INSTAGRAM_URL}/{username}/"
             print(f"👥 Scraping followers from: {username}")
-            self.driver.get(profile_url)
-            self.human_delay(3, 5)
+            self.navigate(profile_url)
+            self.wait_for_page()
 
             try:
                 followers_link = WebDriverWait(self.driver, 10).until(
@@ -629,7 +914,7 @@ class InstagramScraper:
                 )
                 followers_link.click()
                 print("🔄 Opened followers modal")
-                self.human_delay(3, 4)
+                self.pace()
             except Exception as e:
                 print(f"❌ Could not open followers modal: {str(e)}")
                 return []
@@ -643,96 +928,7 @@ class InstagramScraper:
                 print("❌ Followers modal did not load")
                 return []
 
-            followers = []
-            seen_usernames = set()
-            scroll_attempts = 0
-            max_scroll_attempts = 200
-            no_change_count = 0
-
-            scrollable_element = None
-            scroll_selectors = [
-                "//div[@role='dialog']//div[contains(@style, 'overflow')]",
-                "//div[@role='dialog']//div[contains(@class, 'x')]//div[contains(@style, 'height')]",
-                "//div[@role='dialog']//ul/parent::div",
-            ]
-
-            for selector in scroll_selectors:
-                try:
-                    scrollable_element = self.driver.find_element(By.XPATH, selector)
-                    if scrollable_element:
-                        print("✅ Found scrollable element")
-                        break
-                except Exception:
-                    continue
-
-            if not scrollable_element:
-                scrollable_element = modal
-
-            while len(followers) < max_followers and scroll_attempts < max_scroll_attempts:
-                try:
-                    follower_elements = []
-                    username_selectors = [
-                        "//div[@role='dialog']//a[contains(@href, '/')]/span",
-                        "//div[@role='dialog']//span[contains(@class, 'x')]//span",
-                    ]
-
-                    for selector in username_selectors:
-                        try:
-                            elements = self.driver.find_elements(By.XPATH, selector)
-                            if elements:
-                                follower_elements = elements
-                                break
-                        except Exception:
-                            continue
-
-                    previous_count = len(followers)
-
-                    for element in follower_elements:
-                        try:
-                            username_text = element.text.strip()
-                            if username_text and username_text not in seen_usernames:
-                                if ' ' not in username_text and len(username_text) <= 30:
-                                    seen_usernames.add(username_text)
-
-                                    try:
-                                        parent_link = element.find_element(By.XPATH, "./ancestor::a")
-                                        profile_link = parent_link.get_attribute('href')
-                                    except Exception:
-                                        profile_link = f"{Config.INSTAGRAM_URL}/{username_text}/"
-
-                                    follower_data = {
-                                        'username': username_text,
-                                        'profile_url': profile_link,
-                                        'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                                    }
-                                    followers.append(follower_data)
-
-                                    if len(followers) >= max_followers:
-                                        break
-                        except Exception:
-                            continue
-
-                    if len(followers) == previous_count:
-                        no_change_count += 1
-                        if no_change_count >= 10:
-                            break
-                    else:
-                        no_change_count = 0
-
-                except Exception as e:
-                    print(f"⚠️ Error finding followers: {str(e)}")
-
-                try:
-                    self.driver.execute_script(
-                        "arguments[0].scrollTop = arguments[0].scrollHeight",
-                        scrollable_element
-                    )
-                    self.human_delay(2, 3)
-                    print(f"📜 Scrolling... Found {len(followers)} followers so far")
-                except Exception as e:
-                    print(f"⚠️ Scroll error: {str(e)}")
-
-                scroll_attempts += 1
+            followers = self.scroll_dialog_users(modal, max_followers, 'followers')
 
             print(f"✅ Successfully scraped {len(followers)} followers from {username}")
             return followers
@@ -745,8 +941,8 @@ class InstagramScraper:
         try:
             profile_url = f"{Config.INSTAGRAM_URL}/{username}/"
             print(f"👤 Scraping following from: {username}")
-            self.driver.get(profile_url)
-            self.human_delay(3, 5)
+            self.navigate(profile_url)
+            self.wait_for_page()
 
             try:
                 following_link = WebDriverWait(self.driver, 10).until(
@@ -754,7 +950,7 @@ class InstagramScraper:
                 )
                 following_link.click()
                 print("🔄 Opened following modal")
-                self.human_delay(3, 4)
+                self.pace()
             except Exception as e:
                 print(f"❌ Could not open following modal: {str(e)}")
                 return []
@@ -768,95 +964,7 @@ class InstagramScraper:
                 print("❌ Following modal did not load")
                 return []
 
-            following = []
-            seen_usernames = set()
-            scroll_attempts = 0
-            max_scroll_attempts = 200
-            no_change_count = 0
-
-            scrollable_element = None
-            scroll_selectors = [
-                "//div[@role='dialog']//div[contains(@style, 'overflow')]",
-                "//div[@role='dialog']//div[contains(@class, 'x')]//div[contains(@style, 'height')]",
-                "//div[@role='dialog']//ul/parent::div",
-            ]
-
-            for selector in scroll_selectors:
-                try:
-                    scrollable_element = self.driver.find_element(By.XPATH, selector)
-                    if scrollable_element:
-                        break
-                except Exception:
-                    continue
-
-            if not scrollable_element:
-                scrollable_element = modal
-
-            while len(following) < max_following and scroll_attempts < max_scroll_attempts:
-                try:
-                    following_elements = []
-                    username_selectors = [
-                        "//div[@role='dialog']//a[contains(@href, '/')]/span",
-                        "//div[@role='dialog']//span[contains(@class, 'x')]//span",
-                    ]
-
-                    for selector in username_selectors:
-                        try:
-                            elements = self.driver.find_elements(By.XPATH, selector)
-                            if elements:
-                                following_elements = elements
-                                break
-                        except Exception:
-                            continue
-
-                    previous_count = len(following)
-
-                    for element in following_elements:
-                        try:
-                            username_text = element.text.strip()
-                            if username_text and username_text not in seen_usernames:
-                                if ' ' not in username_text and len(username_text) <= 30:
-                                    seen_usernames.add(username_text)
-
-                                    try:
-                                        parent_link = element.find_element(By.XPATH, "./ancestor::a")
-                                        profile_link = parent_link.get_attribute('href')
-                                    except Exception:
-                                        profile_link = f"{Config.INSTAGRAM_URL}/{username_text}/"
-
-                                    following_data = {
-                                        'username': username_text,
-                                        'profile_url': profile_link,
-                                        'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                                    }
-                                    following.append(following_data)
-
-                                    if len(following) >= max_following:
-                                        break
-                        except Exception:
-                            continue
-
-                    if len(following) == previous_count:
-                        no_change_count += 1
-                        if no_change_count >= 10:
-                            break
-                    else:
-                        no_change_count = 0
-
-                except Exception as e:
-                    print(f"⚠️ Error finding following: {str(e)}")
-
-                try:
-                    self.driver.execute_script(
-                        "arguments[0].scrollTop = arguments[0].scrollHeight",
-                        scrollable_element
-                    )
-                    self.human_delay(2, 3)
-                    print(f"📜 Scrolling... Found {len(following)} following so far")
-                except Exception as e:
-                    print(f"⚠️ Scroll error: {str(e)}")
-
-                scroll_attempts += 1
+            following = self.scroll_dialog_users(modal, max_following, 'following')
 
             print(f"✅ Successfully scraped {len(following)} following from {username}")
             return following
@@ -865,177 +973,6 @@ class InstagramScraper:
             print(f"❌ Error scraping following from {username}: {str(e)}")
             return []
 
-    # ===================== COMMENTS (YOUR PARAM STRUCTURE) =====================
-
-    def scrape_post_comments(self, post_url_or_shortcode, max_comments=None):
-
-        # --------- Normalize target → shortcode ---------
-        if 'instagram.com' in post_url_or_shortcode:
-            parts = post_url_or_shortcode.rstrip('/').split('/')
-            shortcode = None
-            for i, part in enumerate(parts):
-                if part in ['p', 'reel', 'tv'] and i + 1 < len(parts):
-                    shortcode = parts[i + 1].split('?')[0]
-                    break
-            if not shortcode:
-                raise ValueError("Invalid Instagram URL for comments scraping")
-        else:
-            shortcode = post_url_or_shortcode
-
-        print(f"💬 Scraping comments for shortcode: {shortcode}")
-        if max_comments:
-            print(f"   📊 Target: {max_comments} comments")
-        else:
-            print("   📊 Target: ALL comments")
-
-        comments = []
-        after = None
-        has_next = True
-
-        # --------- Build one persistent session & sync cookies ---------
-        session = requests.Session()
-        if self.driver:
-            cookies = self.driver.get_cookies()
-            names = {c['name']: c['value'] for c in cookies}
-            for cookie in cookies:
-                session.cookies.set(cookie['name'], cookie['value'])
-
-            print("🍪 Cookies synced from browser to requests session")
-            print(f"   - sessionid: {'PRESENT' if 'sessionid' in names else 'MISSING'}")
-            print(f"   - csrftoken: {names.get('csrftoken', 'MISSING')}")
-        else:
-            print("🍪 Using fresh requests session (no Selenium cookies)")
-
-        while has_next:
-            if max_comments and len(comments) >= max_comments:
-                print(f"✅ Reached comment limit: {max_comments}")
-                break
-
-            batch_size = 50
-            if max_comments:
-                remaining = max_comments - len(comments)
-                batch_size = min(50, remaining)
-
-            variables = {
-                "shortcode": shortcode,
-                "first": batch_size,
-            }
-            if after:
-                variables["after"] = after
-
-            variables_json = quote(json.dumps(variables, separators=(',', ':')))
-            url = (
-                "https://www.instagram.com/graphql/query/"
-                "?query_hash=bc3296d1ce80a24b1b6e40b1e72903f5"
-                f"&variables={variables_json}"
-            )
-
-            try:
-                headers = {
-                    "x-ig-app-id": self.instagram_app_id,
-                    "User-Agent": (
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                    "Accept": "*/*",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "X-Requested-With": "XMLHttpRequest",
-                    "Origin": "https://www.instagram.com",
-                    "Referer": "https://www.instagram.com/",
-                }
-
-                response = session.get(url, headers=headers)
-
-                if response.status_code != 200:
-                    snippet = response.text[:200].replace("\n", " ")
-                    print(f"❌ Failed to fetch comments: Status {response.status_code}")
-                    print(f"   Response snippet: {snippet}")
-
-                    # Special handling for "Please wait a few minutes / require_login"
-                    if response.status_code in (401, 429):
-                        print("⚠️ Instagram says 'Please wait a few minutes' or requires login.")
-                        print("   -> You are probably rate limited or missing a valid sessionid cookie.")
-                        print("   -> Try using another account / proxy / slower speed.")
-                    break
-
-                data = response.json()
-                media_data = data.get('data', {}).get('shortcode_media', {})
-                if not media_data:
-                    print("❌ No media data found for this shortcode")
-                    break
-
-                comment_data = media_data.get('edge_media_to_parent_comment', {})
-
-                for edge in comment_data.get('edges', []):
-                    if max_comments and len(comments) >= max_comments:
-                        break
-
-                    node = edge.get('node', {})
-                    owner = node.get('owner', {})
-
-                    commenter_username = owner.get("username")
-                    if not commenter_username:
-                        continue
-
-                    # ---- Fetch full profile data for commenter (to fill your schema) ----
-                    profile = self.scrape_profile_api(commenter_username)
-                    if not profile:
-                        continue
-
-                    bio = profile.get("biography", "") or ""
-                    bio_emails = self.extract_emails_from_bio(bio)
-                    bio_phones = self.extract_phones_from_bio(bio)
-
-                    full_name = profile.get("fullName", "") or ""
-                    parts = full_name.split(" ", 1)
-                    first_name = parts[0] if parts else ""
-                    last_name = parts[1] if len(parts) > 1 else ""
-
-                    created_at_ts = node.get("created_at")
-                    _created_at_str = (
-                        datetime.fromtimestamp(created_at_ts).strftime("%Y-%m-%d %H:%M:%S")
-                        if created_at_ts else ""
-                    )
-
-                    # ONLY your param structure
-                    comment_obj = {
-                        "username": commenter_username,
-                        "email": "|".join(bio_emails),
-                        "phone": "|".join(bio_phones),
-                        "madid": str(uuid.uuid4()),
-                        "fn": first_name,
-                        "ln": last_name,
-                        "ct": profile.get("ct", ""),
-                        "zip": profile.get("zip", ""),
-                        "st": profile.get("st", ""),
-                        "country": profile.get("country", ""),
-                        "dob": profile.get("dob", ""),
-                        "doby": profile.get("doby", ""),
-                        "gen": profile.get("gen", ""),
-                        "age": profile.get("age", ""),
-                        "uid": profile.get("uid", "") or profile.get("id", ""),
-                        "value": profile.get("value", ""),
-                        "fbid": profile.get("fbid", "")
-                    }
-
-                    comments.append(comment_obj)
-
-                page_info = comment_data.get('page_info', {})
-                has_next = page_info.get('has_next_page', False)
-                after = page_info.get('end_cursor')
-
-                print(f"   📊 Scraped {len(comments)} comments so far...")
-                # Be gentle, avoid hard rate limit
-                time.sleep(2)
-
-            except Exception as e:
-                print(f"❌ Error scraping comments: {str(e)}")
-                break
-
-        print(f"✅ Total comments scraped: {len(comments)}")
-        return comments
-
     # ===================== LIKES =====================
 
     def scrape_post_likes(self, post_url, max_likes=100):
@@ -1048,11 +985,8 @@ class InstagramScraper:
         """
         try:
             print(f"❤️ Scraping likes from: {post_url}")
-            self.driver.get(post_url)
-            self.human_delay(3, 5)
-
-            likes_data = []
-            seen_usernames = set()
+            self.navigate(post_url)
+            self.wait_for_page()
 
             # Click on likes count to open modal
             try:
@@ -1063,7 +997,7 @@ class InstagramScraper:
                 )
                 likes_button.click()
                 print("🔄 Opened likes modal")
-                self.human_delay(3, 4)
+                self.pace()
             except Exception as e:
                 print(f"❌ Could not open likes modal: {str(e)}")
                 return []
@@ -1078,99 +1012,8 @@ class InstagramScraper:
                 print("❌ Likes modal did not load")
                 return []
 
-            scroll_attempts = 0
-            max_scroll_attempts = 200
-            no_change_count = 0
-
-            # Find scrollable container
-            scrollable_element = None
-            scroll_selectors = [
-                "//div[@role='dialog']//div[contains(@style, 'overflow')]",
-                "//div[@role='dialog']//div[contains(@class, 'x')]//div[contains(@style, 'height')]",
-                "//div[@role='dialog']//ul/parent::div",
-            ]
-
-            for selector in scroll_selectors:
-                try:
-                    scrollable_element = self.driver.find_element(By.XPATH, selector)
-                    if scrollable_element:
-                        break
-                except Exception:
-                    continue
-
-            if not scrollable_element:
-                scrollable_element = modal
-
             # Scroll and collect likers
-            while len(likes_data) < max_likes and scroll_attempts < max_scroll_attempts:
-                try:
-                    username_selectors = [
-                        "//div[@role='dialog']//a[contains(@href, '/')]/span",
-                        "//div[@role='dialog']//span[contains(@class, 'x')]//span",
-                    ]
-
-                    liker_elements = []
-                    for selector in username_selectors:
-                        try:
-                            elements = self.driver.find_elements(By.XPATH, selector)
-                            if elements:
-                                liker_elements = elements
-                                break
-                        except Exception:
-                            continue
-
-                    if not liker_elements:
-                        print(f"⚠️ No liker elements found on attempt {scroll_attempts + 1}")
-
-                    previous_count = len(likes_data)
-
-                    for element in liker_elements:
-                        try:
-                            username_text = element.text.strip()
-
-                            if username_text and username_text not in seen_usernames:
-                                if ' ' not in username_text and len(username_text) <= 30:
-                                    seen_usernames.add(username_text)
-
-                                    try:
-                                        parent_link = element.find_element(By.XPATH, "./ancestor::a")
-                                        profile_link = parent_link.get_attribute('href')
-                                    except Exception:
-                                        profile_link = f"{Config.INSTAGRAM_URL}/{username_text}/"
-
-                                    likes_data.append({
-                                        'username': username_text,
-                                        'profile_url': profile_link,
-                                        'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                                    })
-
-                                    if len(likes_data) >= max_likes:
-                                        break
-                        except Exception:
-                            continue
-
-                    if len(likes_data) == previous_count:
-                        no_change_count += 1
-                        if no_change_count >= 10:
-                            print("⚠️ No new likes found after 10 scroll attempts")
-                            break
-                    else:
-                        no_change_count = 0
-
-                except Exception as e:
-                    print(f"⚠️ Error finding likes: {str(e)}")
-
-                try:
-                    self.driver.execute_script(
-                        "arguments[0].scrollTop = arguments[0].scrollHeight",
-                        scrollable_element
-                    )
-                    self.human_delay(2, 3)
-                    print(f"📜 Scrolling... Found {len(likes_data)} likes so far")
-                except Exception as e:
-                    print(f"⚠️ Scroll error: {str(e)}")
-
-                scroll_attempts += 1
+            likes_data = self.scroll_dialog_users(modal, max_likes, 'likes')
 
             print(f"✅ Successfully scraped {len(likes_data)} likes")
             return likes_data
@@ -1183,6 +1026,12 @@ class InstagramScraper:
 
     def close(self):
         """Close the browser safely"""
+        if self._http is not None:
+            try:
+                close_session(self._http)
+            except Exception as e:
+                print(f"⚠️  Error closing HTTP session: {str(e)}")
+            self._http = None
         if self.driver:
             try:
                 self.driver.quit()
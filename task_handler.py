@@ -3,6 +3,53 @@ from database import Database
 from fbid import enrich_fbid
 
 
+# Task types whose progress is saved page by page and can be resumed
+RESUMABLE_TASK_TYPES = ("comments", "followers", "likes", "fbid")
+
+# Item field identifying a row, used to skip rows already saved on resume
+UNIQUE_KEYS = {"comments": "comment_id", "followers": "username", "likes": "username"}
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+def collect_pages(
+    db: Database, task_id: int, task_type: str, fetch_pages, target: str, max_items: int,
+    cancelled=None,
+) -> int:
+    """Stream pages of items into the task, resuming from its saved cursor.
+
+    ``fetch_pages(target, amount, cursor)`` must yield ``(items, next_cursor)``.
+    ``cancelled()`` is checked after each saved page; once it is true the
+    task stops with ``TaskCancelled``, leaving the cursor at that page.
+    """
+    task = db.get_task(task_id)
+    collected = db.count_scraped_items(task_id)
+    resume_cursor = task["resume_cursor"]
+
+    # Items without a cursor means the last page was already saved
+    if collected and not resume_cursor:
+        return collected
+
+    remaining = max_items - collected
+    if remaining <= 0:
+        return collected
+
+    key = UNIQUE_KEYS.get(task_type)
+    seen = db.get_scraped_field_values(task_id, key) if key and collected else set()
+
+    for chunk, next_cursor in fetch_pages(target, remaining, resume_cursor or ""):
+        if key:
+            chunk = [item for item in chunk if item.get(key) is None or item[key] not in seen]
+            seen.update(item[key] for item in chunk if item.get(key) is not None)
+        db.save_task_progress(task_id, task_type, chunk, next_cursor or None)
+        collected += len(chunk)
+        if cancelled and cancelled():
+            raise TaskCancelled("Task cancelled by user")
+    return collected
+
+
 def handle_task(
     db: Database,
     task_id: int,
@@ -10,46 +57,55 @@ def handle_task(
     target: str,
     task_data_id: int | None,
     max_items: int = 10000,
+    account: dict | None = None,
+    cancelled=None,
 ):
+    # Callers passing an account own its lease; otherwise lease one here
+    owns_lease = account is None
     try:
-        account = db.get_available_account()
-        db.update_account_status(account["id"], "in_use")
+        if owns_lease:
+            account = db.lease_account()
         if not account:
             raise ValueError("No available accounts")
 
         scraper = Scraper(f"{account['username']}", proxy=account.get("ip"))
 
-        if task_type == "comments":
-            result = scraper.get_comments(target, max_items)
-        elif task_type == "followers":
-            result = scraper.get_followers(target, max_items)
-        elif task_type == "likes":
-            result = scraper.get_likes(target, max_items)
+        # Streamed task types persist each page as it arrives
+        streams = {
+            "comments": scraper.iter_comments,
+            "followers": scraper.iter_followers,
+            "likes": scraper.iter_likes,
+        }
+
+        result = None
+        if task_type in streams:
+            item_count = collect_pages(
+                db, task_id, task_type, streams[task_type], target, max_items, cancelled
+            )
         elif task_type == "profile":
             result = scraper.get_profile(target)
+            db.save_scraped_data(task_id, task_type, result)
+            item_count = 1 if result else 0
         elif task_type == "fbid":
-            data_records = db.get_scraped_data(task_data_id)
-            if not data_records:
+            data = list(db.iter_scraped_items(task_data_id, limit=max_items))
+            if not data:
                 raise ValueError("No data found for the given task_data_id")
 
-            # Extract the actual list of items from the first record
-            data = data_records[0]["data"]
-            data = data[:max_items]
-
-            db.save_scraped_data(task_id, "fbid", [])
-            result = enrich_fbid(account["username"], data, task_id)
+            item_count = enrich_fbid(db, account["username"], data, task_id)
         else:
             raise ValueError(f"Invalid task type: {task_type}")
 
-        # print(result)
-        # print(type(result))
-
-        db.save_scraped_data(task_id, task_type, result)
-
-        db.update_task_status(task_id, "completed", result=result)
+        # Only a summary goes on the task row; the payload lives in scraped_data
+        db.update_task_status(
+            task_id,
+            "completed",
+            result=f"Successfully scraped {item_count} item(s) from {target}",
+            item_count=item_count,
+        )
         return result
     except Exception as e:
         db.update_task_status(task_id, "failed", error_message=str(e))
         raise
     finally:
-        db.update_account_status(account["username"], "available")
+        if owns_lease and account:
+            db.release_account(account["id"])
@@ -0,0 +1,202 @@
+import logging
+import threading
+
+from config import Config
+from database import Database
+from task_handler import handle_task
+from row_cache import RowCache
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Bounded worker pool that drains pending tasks from the tasks table.
+
+    The tasks table is the queue: workers atomically claim the oldest pending
+    row, so queued work survives restarts and several workers (or processes)
+    never pick up the same task. ``handlers`` maps task types that are not
+    run by ``handle_task`` (the browser-only ones) to a ``handler(task,
+    account)`` callable; the queue leases and releases the account either way.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        workers: int = Config.WORKER_COUNT,
+        per_account: int = Config.MAX_CONCURRENT_TASKS_PER_ACCOUNT,
+        poll_interval: float = Config.QUEUE_POLL_INTERVAL,
+        lease_seconds: int = Config.ACCOUNT_LEASE_SECONDS,
+        row_cache: RowCache = None,
+        handlers: dict = None,
+    ):
+        self.db = db
+        self.row_cache = row_cache
+        self.handlers = handlers or {}
+        self.workers = workers
+        self.per_account = per_account
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.running = {}
+        self._leases = {}
+        # task id -> Event set by cancel(), checked by the worker between pages
+        self._cancels = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the workers; calling it again is a no-op"""
+        if self._threads:
+            return
+
+        requeued = self.db.requeue_interrupted_tasks()
+        if requeued:
+            logger.info(f'Re-queued {requeued} interrupted task(s)')
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'task-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        heartbeat = threading.Thread(target=self._renew_leases, name='lease-heartbeat', daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f'Started {self.workers} task worker(s)')
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def notify(self):
+        """Wake idle workers after a task has been queued"""
+        self._wakeup.set()
+
+    def cancel(self, task_id) -> bool:
+        """Ask the worker running ``task_id`` to stop after its current page.
+
+        Returns False if no worker of this queue is running the task.
+        """
+        with self._lock:
+            event = self._cancels.get(task_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+    def is_running(self, task_id) -> bool:
+        with self._lock:
+            return task_id in self.running
+
+    def stats(self):
+        stats = self.db.get_queue_stats()
+        with self._lock:
+            stats['workers'] = self.workers
+            stats['busy_workers'] = len(self.running)
+        return stats
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                pending = self.db.has_pending_tasks()
+            except Exception as e:
+                logger.error(f'Failed to check the queue: {e}')
+                pending = False
+
+            if not pending:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            # Lease before claiming, so a task waiting for a free account stays
+            # 'pending' and its wait time keeps counting
+            account = self._acquire_account()
+            if self._stop.is_set():
+                if account:
+                    self.db.release_account(account['id'])
+                break
+
+            try:
+                task = self.db.claim_next_task()
+            except Exception as e:
+                logger.error(f'Failed to claim task: {e}')
+                task = None
+
+            if not task:
+                # Another worker took it
+                if account:
+                    self.db.release_account(account['id'])
+                continue
+
+            self._run(task, account)
+
+    def _acquire_account(self):
+        """Lease an account, waiting while every account is at its concurrency cap"""
+        while not self._stop.is_set():
+            account = self.db.lease_account(self.lease_seconds, max_leases=self.per_account)
+            if account:
+                return account
+            if not self.db.get_all_accounts():
+                return None
+            self._stop.wait(self.poll_interval)
+        return None
+
+    def _renew_leases(self):
+        """Keep leases of long-running tasks from expiring"""
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                account_ids = set(self._leases.values())
+            for account_id in account_ids:
+                try:
+                    self.db.renew_account_lease(account_id, self.lease_seconds)
+                except Exception as e:
+                    logger.error(f'Failed to renew lease for account {account_id}: {e}')
+
+    def _run(self, task, account):
+        task_id = task['id']
+        cancel = threading.Event()
+        with self._lock:
+            self.running[task_id] = task
+            self._cancels[task_id] = cancel
+        completed = False
+        try:
+            if not account:
+                raise ValueError("No available accounts")
+            with self._lock:
+                self._leases[task_id] = account['id']
+
+            logger.info(f"Task #{task_id} started. Type : {task['task_type']}")
+            handler = self.handlers.get(task['task_type'])
+            if handler:
+                handler(task, account)
+            else:
+                handle_task(
+                    self.db,
+                    task_id,
+                    task['task_type'],
+                    task['target'],
+                    task['task_data_id'],
+                    task['max_items'] or 10000,
+                    account=account,
+                    cancelled=cancel.is_set,
+                )
+            completed = True
+        except Exception as e:
+            logger.error(f'Task #{task_id} failed: {e}')
+            self.db.update_task_status(task_id, 'failed', error_message=str(e))
+        finally:
+            if account:
+                with self._lock:
+                    self._leases.pop(task_id, None)
+                self.db.release_account(account['id'])
+            # Only now may the task be resumed by another worker
+            with self._lock:
+                self.running.pop(task_id, None)
+                self._cancels.pop(task_id, None)
+
+        if completed and self.row_cache is not None:
+            # Flatten the finished task's rows now rather than on the first table view
+            try:
+                self.row_cache.materialize(task)
+            except Exception as e:
+                logger.warning(f'Could not materialize rows of task #{task_id}: {e}')
@@ -0,0 +1,62 @@
+import random
+import time
+
+from contact_extractor import (
+    EMAIL_RE, PHONE_RE, extract_contacts, extract_contacts_batch, find_emails, find_phones
+)
+
+# Pieces that exercise the edges of the '@'-anchored scan: local runs that
+# stop at '@', '.', spaces or punctuation, several '@' in a row and domains
+# without a valid TLD
+FRAGMENTS = [
+    "hello", "a", "john.doe", "x_y%z+tag", "-", ".", "..", "@", "@@", " ", "\n",
+    "gmail.com", "mail.co.uk", "example", "ex-ample.io", "c", "co", "com1",
+    "📸", "✉️", "(", ")", ":", ",", "/", "+1 555-123-4567", "biz", "DM for collabs",
+]
+
+
+def random_bio(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+def test_find_emails_matches_regex_findall():
+    rng = random.Random(20261018)
+    for _ in range(5000):
+        bio = random_bio(rng)
+        assert find_emails(bio) == EMAIL_RE.findall(bio), bio
+
+
+def test_find_emails_examples():
+    assert find_emails("contact: jane.doe+ig@mail.co.uk or bob@example.com") == [
+        "jane.doe+ig@mail.co.uk", "bob@example.com",
+    ]
+    assert find_emails("a@b@c.com") == EMAIL_RE.findall("a@b@c.com")
+    assert find_emails("no address here") == []
+    assert find_emails("") == []
+    assert find_emails(None) == []
+
+
+def test_find_emails_long_word_is_linear():
+    # One long run of local characters and many '@' used to retry the
+    # pattern from every position
+    bio = "a" * 20000 + "@" * 2000 + "b" * 20000
+    start = time.perf_counter()
+    assert find_emails(bio) == []
+    assert time.perf_counter() - start < 0.5
+
+
+def test_find_phones_matches_regex_findall():
+    rng = random.Random(7)
+    for _ in range(2000):
+        bio = random_bio(rng)
+        assert find_phones(bio) == PHONE_RE.findall(bio), bio
+    assert find_phones("no digits") == []
+
+
+def test_extract_contacts_batch_matches_single_bios():
+    bios = ["mail me: a.b@c.io", None, "", "call +1 555-123-4567", "mail me: a.b@c.io"]
+    results = extract_contacts_batch(bios)
+    assert results == [extract_contacts(bio or "") for bio in bios]
+    # Repeated bios share the extraction but not the returned lists
+    results[0][0].append("changed")
+    assert results[4][0] == ["a.b@c.io"]
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'scraper.db'))
+
+
+def row_chunks(count, chunk=100, tag=''):
+    rows = [{'username': f'user{i}{tag}'} for i in range(count)]
+    return [rows[i:i + chunk] for i in range(0, count, chunk)]
+
+
+def builds_of(db, task_id):
+    with db.get_connection() as conn:
+        return {
+            row['build'] for row in conn.execute(
+                'SELECT DISTINCT build FROM task_rows WHERE task_id = ?', (task_id,)
+            )
+        }
+
+
+def test_reader_of_previous_build_survives_a_rebuild(db):
+    task_id = db.create_task('followers', 'someone')
+    first, _ = db.replace_task_rows(task_id, 0, ['username'], row_chunks(2500))
+
+    reader = db.iter_task_rows(task_id, first, batch_size=100)
+    rows = next(reader)
+    # A rebuild lands while the export is streaming the first build
+    second, _ = db.replace_task_rows(task_id, 1, ['username'], row_chunks(2500, tag='b'))
+    for chunk in reader:
+        rows.extend(chunk)
+
+    assert db.get_row_set(task_id)['build'] == second
+    assert [row['username'] for row in rows] == [f'user{i}' for i in range(2500)]
+
+
+def test_builds_older_than_the_previous_one_are_pruned(db):
+    task_id = db.create_task('followers', 'someone')
+    first, _ = db.replace_task_rows(task_id, 0, ['username'], row_chunks(300))
+    second, _ = db.replace_task_rows(task_id, 1, ['username'], row_chunks(300))
+    assert builds_of(db, task_id) == {first, second}
+
+    third, _ = db.replace_task_rows(task_id, 2, ['username'], row_chunks(300))
+    assert builds_of(db, task_id) == {second, third}
+
+
+def test_build_of_an_older_revision_is_discarded(db):
+    task_id = db.create_task('followers', 'someone')
+    newer, _ = db.replace_task_rows(task_id, 5, ['username'], row_chunks(10))
+    db.replace_task_rows(task_id, 4, ['username'], row_chunks(10))
+
+    assert db.get_row_set(task_id)['build'] == newer
+    assert builds_of(db, task_id) == {newer}
+
+
+CLAIMERS = 32
+
+
+def test_concurrent_claimers_never_double_lease(tmp_path):
+    path = str(tmp_path / 'scraper.db')
+    setup = Database(path)
+    for i in range(4):
+        setup.add_account(f'account{i}', 'secret')
+
+    # One Database per claimer, like separate worker processes
+    databases = [Database(path) for _ in range(CLAIMERS)]
+    barrier = threading.Barrier(CLAIMERS)
+    leased = []
+
+    def claim(database):
+        barrier.wait()
+        account = database.lease_account(lease_seconds=60, max_leases=1)
+        if account:
+            leased.append(account['id'])
+
+    threads = [threading.Thread(target=claim, args=(database,)) for database in databases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(leased) == 4
+    assert len(set(leased)) == 4
+    assert all(account['active_leases'] == 1 for account in setup.get_all_accounts())
+
+
+def test_lease_and_release_under_contention(tmp_path):
+    path = str(tmp_path / 'scraper.db')
+    setup = Database(path)
+    for i in range(2):
+        setup.add_account(f'account{i}', 'secret')
+
+    holders = Counter()
+    lock = threading.Lock()
+    errors = []
+    barrier = threading.Barrier(CLAIMERS)
+
+    def work(database):
+        barrier.wait()
+        for _ in range(10):
+            account = database.lease_account(lease_seconds=60, max_leases=2)
+            if not account:
+                continue
+            with lock:
+                holders[account['id']] += 1
+                if holders[account['id']] > 2:
+                    errors.append(account['id'])
+            time.sleep(0.001)
+            # Leave the holder count before the lease ends, never after
+            with lock:
+                holders[account['id']] -= 1
+            database.release_account(account['id'])
+
+    threads = [
+        threading.Thread(target=work, args=(Database(path),)) for _ in range(CLAIMERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert all(account['active_leases'] == 0 for account in setup.get_all_accounts())
+
+
+def task_status(path, task_id):
+    # Read through a separate Database, which only sees committed data
+    task = Database(path).get_task(task_id)
+    return task['status'] if task else None
+
+
+def test_only_the_outermost_block_commits(tmp_path):
+    path = str(tmp_path / 'scraper.db')
+    db = Database(path)
+    task_id = db.create_task('followers', 'someone')
+
+    with db.get_connection() as outer:
+        with db.get_connection() as inner:
+            assert inner is outer
+            inner.execute("UPDATE tasks SET status = 'running' WHERE id = ?", (task_id,))
+        # The inner block has ended but nothing is committed yet
+        assert task_status(path, task_id) == 'pending'
+        db.update_task_status(task_id, 'completed')
+        assert task_status(path, task_id) == 'pending'
+
+    assert task_status(path, task_id) == 'completed'
+
+
+def test_nested_failure_rolls_back_the_outer_block(tmp_path):
+    path = str(tmp_path / 'scraper.db')
+    db = Database(path)
+    task_id = db.create_task('followers', 'someone')
+
+    with pytest.raises(RuntimeError):
+        with db.get_connection() as conn:
+            conn.execute("UPDATE tasks SET status = 'running' WHERE id = ?", (task_id,))
+            with db.get_connection():
+                db.save_task_progress(task_id, 'followers', [{'username': 'a'}], 'cursor')
+                raise RuntimeError('page failed')
+
+    assert task_status(path, task_id) == 'pending'
+    assert db.count_scraped_items(task_id) == 0
+    # The connection went back to the pool in a usable state
+    db.update_task_status(task_id, 'completed')
+    assert task_status(path, task_id) == 'completed'
+
+
+def test_threads_get_their_own_connection(db):
+    seen = []
+
+    def borrow():
+        with db.get_connection() as conn:
+            seen.append(id(conn))
+            barrier.wait()
+
+    barrier = threading.Barrier(4)
+    threads = [threading.Thread(target=borrow) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(seen)) == 4
@@ -0,0 +1,172 @@
+from urllib.parse import urljoin
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from config import Config
+from scraper import InstagramScraper
+
+html = pytest.importorskip('lxml.html')
+
+BASE_URL = 'https://www.instagram.com/'
+
+# Rows of a followers dialog: plain usernames, a repeated user, a display
+# name with spaces, an overlong name and an empty label
+USERNAMES = (
+    [f'user_{i:03d}' for i in range(40)]
+    + ['user_005', 'Display Name', 'x' * 31, '']
+    + [f'late.user{i}' for i in range(20)]
+)
+
+
+def dialog_html(usernames):
+    rows = ''.join(
+        f'<li><div class="x1"><a href="/{name or "empty"}/"><span>{name}</span></a></div></li>'
+        for name in usernames
+    )
+    return (
+        '<html><body><div role="dialog">'
+        f'<div class="x9" style="overflow: auto; height: 400px"><ul>{rows}</ul></div>'
+        '</div></body></html>'
+    )
+
+
+class Element:
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def text(self):
+        return self.node.text_content().strip()
+
+    def get_attribute(self, name):
+        value = self.node.get(name)
+        return urljoin(BASE_URL, value) if name == 'href' and value else value
+
+    def find_element(self, by, value):
+        found = self.node.xpath(value)
+        if not found:
+            raise NoSuchElementException(value)
+        return Element(found[-1] if value.startswith('./ancestor') else found[0])
+
+
+class DialogDriver:
+    """Driver stand-in over a static dialog fixture, rendering ``batch`` rows per scroll.
+
+    ``execute_script`` runs the Python equivalent of each script the
+    scraper sends, evaluating the scraper's real XPath selectors.
+    """
+
+    def __init__(self, usernames, batch=15):
+        self.all_rows = html.fromstring(dialog_html(usernames)).xpath('//li')
+        self.tree = html.fromstring(dialog_html([]))
+        self.list = self.tree.xpath('//ul')[0]
+        self.batch = batch
+        self.calls = {'extract': 0, 'find': 0}
+        self._render()
+
+    def _render(self):
+        rendered = len(self.list)
+        for row in self.all_rows[rendered:rendered + self.batch]:
+            self.list.append(html.fromstring(html.tostring(row)))
+
+    def find_element(self, by, value):
+        self.calls['find'] += 1
+        found = self.tree.xpath(value)
+        if not found:
+            raise NoSuchElementException(value)
+        return Element(found[0])
+
+    def find_elements(self, by, value):
+        self.calls['find'] += 1
+        return [Element(node) for node in self.tree.xpath(value)]
+
+    def execute_script(self, script, *args):
+        if script == InstagramScraper.EXTRACT_DIALOG_USERS_JS:
+            self.calls['extract'] += 1
+            return self._extract(args[0])
+        if script == InstagramScraper.SCROLL_STATE_JS:
+            return [len(self.list) * 50, len(self.list)]
+        if 'scrollTop' in script:
+            self._render()
+        return None
+
+    def _extract(self, selectors):
+        nodes = []
+        for xpath in selectors:
+            nodes = self.tree.xpath(xpath)
+            if nodes:
+                break
+        rows = []
+        for node in nodes:
+            if node.get('data-ig-seen'):
+                continue
+            text = node.text_content().strip()
+            if not text:
+                continue
+            node.set('data-ig-seen', '1')
+            link = next((a for a in node.iterancestors('a')), None)
+            rows.append({
+                'username': text,
+                'href': urljoin(BASE_URL, link.get('href')) if link is not None else None,
+            })
+        return rows
+
+
+def old_dom_walk(driver, max_items):
+    """The per-element walk scroll_dialog_users replaced, one find per row"""
+    users, seen = [], set()
+    for _ in range(len(USERNAMES)):
+        for selector in InstagramScraper.DIALOG_USERNAME_SELECTORS:
+            elements = driver.find_elements(By.XPATH, selector)
+            if elements:
+                break
+        for element in elements:
+            username_text = element.text.strip()
+            if username_text and username_text not in seen:
+                if ' ' not in username_text and len(username_text) <= 30:
+                    seen.add(username_text)
+                    try:
+                        link = element.find_element(By.XPATH, './ancestor::a').get_attribute('href')
+                    except Exception:
+                        link = f'{Config.INSTAGRAM_URL}/{username_text}/'
+                    users.append({'username': username_text, 'profile_url': link})
+                    if len(users) >= max_items:
+                        return users
+        driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', None)
+    return users
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(Config, 'SCROLL_WAIT_TIMEOUT', 0.05)
+    scraper = InstagramScraper(debug_port=9222)
+    scraper.pacing_floor = 0
+    return scraper
+
+
+def collect(scraper, driver, max_items):
+    scraper.driver = driver
+    users = scraper.scroll_dialog_users(object(), max_items, 'followers')
+    return [{key: user[key] for key in ('username', 'profile_url')} for user in users]
+
+
+@pytest.mark.parametrize('max_items', [10, 30, 1000])
+def test_users_match_the_old_dom_walk(scraper, max_items):
+    expected = old_dom_walk(DialogDriver(USERNAMES), max_items)
+    assert collect(scraper, DialogDriver(USERNAMES), max_items) == expected
+    assert len(expected) == min(max_items, 60)
+
+
+def test_one_extraction_round_trip_per_scroll(scraper):
+    driver = DialogDriver(USERNAMES, batch=15)
+    users = collect(scraper, driver, 1000)
+
+    assert len(users) == 60
+    # One extraction pass per rendered batch plus the passes that find the
+    # list exhausted; rows are never looked up one by one
+    batches = -(-len(USERNAMES) // driver.batch)
+    assert batches <= driver.calls['extract'] <= batches + 3
+    # The only element lookup is the scroll container
+    assert driver.calls['find'] == 1
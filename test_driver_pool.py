@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import driver_pool
+from driver_pool import DriverPool
+
+
+class FakeScraper:
+    def __init__(self, profile_dir):
+        self.profile_dir = profile_dir
+        self.is_logged_in = False
+        self.closed = False
+
+    def init_driver(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+    def login(self, username, password):
+        self.is_logged_in = password != 'wrong'
+        return self.is_logged_in
+
+    def close(self):
+        self.closed = True
+
+    def is_driver_alive(self):
+        return not self.closed
+
+    def js_heap_mb(self):
+        return 1
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver_pool, 'InstagramScraper', FakeScraper)
+    return DriverPool(max_size=2, max_tasks=2, profile_root=str(tmp_path / 'profiles'))
+
+
+def profile_dirs(pool):
+    root = pool.profile_root
+    return sorted(os.listdir(root)) if os.path.isdir(root) else []
+
+
+def test_recycled_and_failed_drivers_remove_their_profile_dir(pool):
+    for _ in range(5):
+        with pool.acquire('alice', 'secret'):
+            pass
+    with pytest.raises(Exception):
+        with pool.acquire('bob', 'wrong'):
+            pass
+
+    # Only the one warm driver still has a profile directory
+    assert len(profile_dirs(pool)) == 1
+    assert pool.stats()['idle'] == 1
+
+
+def test_close_all_at_exit_closes_busy_drivers(pool):
+    with pool.acquire('alice', 'secret') as busy:
+        with pool.acquire('bob', 'secret'):
+            pass
+        pool.close_all(include_busy=True)
+        assert busy.closed
+        assert profile_dirs(pool) == []
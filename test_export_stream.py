@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask, request
+
+from export_stream import export_response, parse_range, resolve_range
+
+BODY = ''.join(f'line {i}\n' for i in range(200))
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/export')
+    def export():
+        return export_response(
+            lambda: iter([BODY[:500], BODY[500:]]), 'export.txt', 'text/plain',
+            'test-etag', request
+        )
+    return app.test_client()
+
+
+def test_single_range_is_served_partially(client):
+    response = client.get('/export', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.data == BODY[10:20].encode()
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(BODY)}'
+
+
+def test_suffix_and_open_ranges(client):
+    assert client.get('/export', headers={'Range': 'bytes=-5'}).data == BODY[-5:].encode()
+    assert client.get('/export', headers={'Range': 'bytes=100-'}).data == BODY[100:].encode()
+
+
+@pytest.mark.parametrize('header', [
+    'bytes=0-10,20-30', 'bytes=5-3', 'items=0-10', 'bytes=abc', 'bytes=-', 'bytes',
+])
+def test_multi_range_or_malformed_header_gets_full_body(client, header):
+    response = client.get('/export', headers={'Range': header})
+    assert response.status_code == 200
+    assert response.data == BODY.encode()
+
+
+@pytest.mark.parametrize('header', [f'bytes={len(BODY)}-', f'bytes={len(BODY) + 50}-60000', 'bytes=-0'])
+def test_out_of_bounds_single_range_is_416(client, header):
+    response = client.get('/export', headers={'Range': header})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(BODY)}'
+
+
+def test_parse_and_resolve_range():
+    assert parse_range('bytes=0-10,20-30') is None
+    assert parse_range(None) is None
+    assert parse_range('bytes=3-') == (3, None)
+    assert resolve_range((3, 1000), 100) == (3, 99)
+    assert resolve_range((None, 1000), 100) == (0, 99)
+    assert resolve_range((100, None), 100) is None
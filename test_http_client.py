@@ -0,0 +1,91 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+import urllib3.connectionpool
+from urllib3.connection import HTTPConnection
+
+from http_client import HttpMetrics, close_session, create_session
+from scraper import InstagramScraper
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Count connections opened by any urllib3 pool"""
+    counter = {'connections': 0}
+
+    class CountingConnection(HTTPConnection):
+        def connect(self):
+            counter['connections'] += 1
+            super().connect()
+
+    monkeypatch.setattr(urllib3.connectionpool.HTTPConnectionPool, 'ConnectionCls', CountingConnection)
+    return counter
+
+
+def test_pooled_session_reuses_one_connection(server, opened):
+    session = create_session()
+    try:
+        for _ in range(20):
+            assert session.get(f'{server}/api', timeout=5).json() == {'ok': True}
+        assert opened['connections'] == 1
+        assert HttpMetrics._pool_counts(session) == (1, 20)
+    finally:
+        close_session(session)
+
+
+def test_unpooled_requests_open_a_connection_per_call(server, opened):
+    for _ in range(5):
+        requests.get(f'{server}/api', timeout=5)
+    assert opened['connections'] == 5
+
+
+def test_scraper_calls_share_its_session(server, opened):
+    scraper = InstagramScraper(debug_port=9222)
+    try:
+        for _ in range(10):
+            scraper.http.get(f'{server}/api', timeout=5)
+        assert scraper.http is scraper.http
+        assert opened['connections'] == 1
+    finally:
+        scraper.close()
+
+
+def test_closed_session_counters_stay_in_the_stats(server):
+    metrics = HttpMetrics()
+    session = create_session()
+    metrics.track(session)
+    for _ in range(4):
+        session.get(f'{server}/api', timeout=5)
+
+    metrics.forget(session)
+    session.close()
+    stats = metrics.stats()
+    assert stats['connections_opened'] == 1
+    assert stats['connection_reuse_rate'] == 0.75
@@ -0,0 +1,91 @@
+import pytest
+
+from insta_scraper import Scraper
+
+COMMENTS_PAGE = 15
+LIKERS_PAGE = 50
+
+
+def user(i):
+    return {
+        'pk': str(1000 + i), 'username': f'user{i}', 'full_name': f'User {i}',
+        'profile_pic_url': f'https://cdn.example.com/{i}.jpg', 'is_private': i % 2 == 0,
+    }
+
+
+class FakeClient:
+    """instagrapi Client stand-in serving a post with ``size`` comments and likers"""
+
+    def __init__(self, size):
+        self.size = size
+        self.requests = []
+
+    def media_pk_from_url(self, url):
+        return 42
+
+    def media_id(self, media_pk):
+        return f'{media_pk}_1'
+
+    def private_request(self, endpoint, params=None):
+        self.requests.append((endpoint, params))
+        start = int((params or {}).get('max_id') or 0)
+        if endpoint.endswith('/comments/'):
+            end = min(start + COMMENTS_PAGE, self.size)
+            return {
+                'comments': [
+                    {
+                        'pk': str(i), 'text': 'nice', 'user': user(i),
+                        'created_at_utc': 1700000000, 'content_type': 'comment',
+                        'status': 'Active', 'has_liked_comment': False,
+                        'comment_like_count': 0,
+                    }
+                    for i in range(start, end)
+                ],
+                'has_more_comments': end < self.size,
+                'next_max_id': str(end) if end < self.size else None,
+            }
+        end = min(start + LIKERS_PAGE, self.size)
+        return {
+            'users': [user(i) for i in range(start, end)],
+            'next_max_id': str(end) if end < self.size else None,
+        }
+
+
+def scraper_for(size):
+    scraper = Scraper.__new__(Scraper)
+    scraper.session_name = 'test'
+    scraper.cl = FakeClient(size)
+    return scraper
+
+
+@pytest.mark.parametrize('amount', [1, 20, 100])
+@pytest.mark.parametrize('size', [200, 5000])
+def test_comment_requests_scale_with_amount_not_post_size(amount, size):
+    scraper = scraper_for(size)
+    comments = scraper.get_comments('https://www.instagram.com/p/abc/', amount)
+
+    assert [c['comment_id'] for c in comments] == [str(i) for i in range(amount)]
+    assert len(scraper.cl.requests) == -(-amount // COMMENTS_PAGE)
+
+
+@pytest.mark.parametrize('amount', [1, 120])
+@pytest.mark.parametrize('size', [200, 5000])
+def test_like_requests_scale_with_amount_not_post_size(amount, size):
+    scraper = scraper_for(size)
+    likes = scraper.get_likes('https://www.instagram.com/p/abc/', amount)
+
+    assert [like['username'] for like in likes] == [f'user{i}' for i in range(amount)]
+    assert len(scraper.cl.requests) == -(-amount // LIKERS_PAGE)
+
+
+def test_comments_resume_from_the_page_cursor():
+    scraper = scraper_for(100)
+    pages = scraper.iter_comments('https://www.instagram.com/p/abc/', amount=100)
+    first, cursor = next(pages)
+    assert cursor == f'max_id:{COMMENTS_PAGE}'
+
+    rest = []
+    for chunk, _ in scraper.iter_comments('https://www.instagram.com/p/abc/', 100 - len(first), cursor):
+        rest.extend(chunk)
+    ids = [c['comment_id'] for c in first + rest]
+    assert ids == [str(i) for i in range(100)]
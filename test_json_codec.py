@@ -0,0 +1,86 @@
+import enum
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import json_codec
+
+
+class Color(enum.Enum):
+    RED = 1
+    BLUE = 'blue'
+
+
+class Level(enum.IntEnum):
+    HIGH = 3
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+PAYLOADS = [
+    {'b': 2 ** 70, 'n': -2 ** 63 - 1, 'u': 2 ** 64 - 1, 'small': -42},
+    {'color': Color.RED, 'other': Color.BLUE, 'level': Level.HIGH},
+    {'scraped_at': datetime(2026, 10, 18, 12, 30, 5), 'day': date(2026, 10, 18)},
+    {1: 'int key', 2.5: 'float key', None: 'null key', True: 'bool key'},
+    {'nan': float('nan'), 'inf': float('inf')},
+    {'text': 'naïve café ✉️ "quoted" \\ slash', 'empty': '', 'none': None},
+    {'tuple': (1, 2), 'set': {3}, 'decimal': Decimal('1.50'), 'uuid': uuid.UUID(int=7)},
+    {'point': Point(1, 2)},
+    {
+        'username': 'someone', 'followers_count': 1234, 'is_private': False,
+        'latestPosts': [{'pk': '3141592653589793238_123', 'likes': 10, 'tags': ['a', 'b']}],
+    },
+    [{'username': f'user{i}', 'pk': 10 ** 18 + i} for i in range(50)],
+]
+
+
+@pytest.fixture
+def use_backend(monkeypatch):
+    def use(name):
+        if name != 'stdlib':
+            pytest.importorskip(name)
+        monkeypatch.setattr(json_codec, 'BACKEND', name)
+    return use
+
+
+def encode_all(use_backend, name):
+    use_backend(name)
+    return [(json_codec.dumps(p), json_codec.dumps_pretty(p)) for p in PAYLOADS]
+
+
+def test_orjson_output_matches_stdlib(use_backend):
+    expected = encode_all(use_backend, 'stdlib')
+    assert encode_all(use_backend, 'orjson') == expected
+
+
+def test_enums_are_written_by_value():
+    assert json_codec.loads(json_codec.dumps(PAYLOADS[1])) == {
+        'color': 1, 'other': 'blue', 'level': 3,
+    }
+
+
+@pytest.mark.parametrize('backend', ['orjson', 'msgspec'])
+def test_decoding_matches_stdlib(use_backend, backend):
+    use_backend('stdlib')
+    # NaN never compares equal, so that payload is left out
+    texts = [json_codec.dumps(p) for p in PAYLOADS if 'NaN' not in json_codec.dumps(p)]
+    expected = [json_codec.loads(text) for text in texts]
+
+    use_backend(backend)
+    assert [json_codec.loads(text) for text in texts] == expected
+    assert [json_codec.loads(text.encode()) for text in texts] == expected
+
+
+def test_wide_integers_round_trip_exactly(use_backend):
+    use_backend('orjson')
+    value = {'b': 2 ** 70, 'n': -2 ** 63 - 1, 'u': 2 ** 64 - 1}
+    decoded = json_codec.loads(json_codec.dumps(value))
+    assert decoded == value
+    assert all(isinstance(v, int) for v in decoded.values())
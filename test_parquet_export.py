@@ -0,0 +1,41 @@
+import pytest
+
+import parquet_export
+from database import Database
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'scraper.db'))
+
+
+def test_keys_first_seen_in_a_later_chunk_are_kept(db, tmp_path):
+    # fbid rows are written as collected, so a late key reaches the export
+    task_id = db.create_task('fbid', 'someone')
+    items = [{'username': f'user{i}', 'fbid': str(i)} for i in range(5)]
+    items += [{'username': 'late', 'fbid': '5', 'late_key': 'x'}]
+    db.save_task_progress(task_id, 'fbid', items, None)
+    path = tmp_path / 'out.parquet'
+
+    written = parquet_export.write_task_parquet(db, db.get_task(task_id), str(path), batch_size=2)
+
+    table = pq.read_table(path)
+    assert written == 6
+    assert 'late_key' in table.column_names
+    assert table.column('late_key').to_pylist() == [None] * 5 + ['x']
+
+
+def test_unscanned_stream_takes_its_columns_from_the_first_chunk(tmp_path):
+    chunks = [[{'username': 'a'}], [{'username': 'b', 'late_key': 'x'}]]
+    path = tmp_path / 'out.parquet'
+
+    parquet_export.write_parquet(str(path), 'followers', iter(chunks))
+    assert 'late_key' not in pq.read_table(path).column_names
+
+    parquet_export.write_parquet(
+        str(path), 'followers', iter(chunks),
+        schema=parquet_export.scan_schema('followers', chunks),
+    )
+    assert pq.read_table(path).column('late_key').to_pylist() == [None, 'x']
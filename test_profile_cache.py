@@ -0,0 +1,56 @@
+import threading
+import time
+
+from database import Database
+from profile_cache import ProfileCache
+
+
+def test_failed_lookups_leave_no_key_locks():
+    cache = ProfileCache(ttl=60, max_entries=10)
+    for i in range(100):
+        assert cache.get_or_fetch('api', f'missing{i}', lambda username: None) is None
+    assert cache._key_locks == {}
+    assert cache.stats()['misses'] == 100
+
+
+def test_concurrent_misses_fetch_once():
+    cache = ProfileCache(ttl=60, max_entries=10)
+    fetches = []
+    barrier = threading.Barrier(8)
+
+    def fetch(username):
+        fetches.append(username)
+        time.sleep(0.05)
+        return {'username': username}
+
+    def lookup():
+        barrier.wait()
+        assert cache.get_or_fetch('web', 'Someone', fetch) == {'username': 'Someone'}
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fetches == ['Someone']
+    assert cache._key_locks == {}
+
+
+def test_expired_rows_are_purged_every_n_writes(tmp_path):
+    db = Database(str(tmp_path / 'scraper.db'))
+    old = time.time() - 3600
+    for i in range(5):
+        db.save_cached_profile('web', f'old{i}', {'username': f'old{i}'}, old)
+
+    cache = ProfileCache(ttl=60, max_entries=100, purge_every=3)
+    cache.use_database(db)
+    assert db.get_cached_profile('web', 'old0', 86400) is None
+
+    for i in range(5):
+        db.save_cached_profile('web', f'old{i}', {'username': f'old{i}'}, old)
+    cache.set('web', 'a', {'username': 'a'})
+    cache.set('web', 'b', {'username': 'b'})
+    assert db.get_cached_profile('web', 'old0', 86400) is not None
+    cache.set('web', 'c', {'username': 'c'})
+    assert db.get_cached_profile('web', 'old0', 86400) is None
+    assert cache.get('web', 'c') == {'username': 'c'}
@@ -0,0 +1,100 @@
+import pytest
+
+from config import Config
+from scraper import InstagramScraper
+
+
+class FakeGrid:
+    """Driver stand-in serving a post grid that loads ``batch`` posts per scroll.
+
+    Every post has two anchors (the tile and its carousel link), and each
+    batch re-renders the last posts of the previous one, as Instagram's grid
+    does. ``returned`` counts anchors handed to the scraper.
+    """
+
+    current_url = 'about:blank'
+
+    def __init__(self, total, batch, overlap=3):
+        self.posts = [f'post{i:05d}' for i in range(total)]
+        self.batch = batch
+        self.overlap = overlap
+        self.loaded = 0
+        self.anchors = []
+        self.tagged = 0
+        self.returned = 0
+        self.extract_calls = 0
+        self._load()
+
+    def _load(self):
+        start = max(0, self.loaded - self.overlap)
+        end = min(len(self.posts), self.loaded + self.batch)
+        for shortcode in self.posts[start:end]:
+            href = f'https://www.instagram.com/p/{shortcode}/'
+            self.anchors.append({'href': href, 'src': f'{shortcode}.jpg', 'alt': shortcode})
+            self.anchors.append({'href': href + '?img_index=1', 'src': f'{shortcode}.jpg', 'alt': ''})
+        self.loaded = end
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return 'body'
+
+    def execute_script(self, script, *args):
+        if script == InstagramScraper.EXTRACT_NEW_POSTS_JS:
+            self.extract_calls += 1
+            rows = self.anchors[self.tagged:]
+            self.tagged = len(self.anchors)
+            self.returned += len(rows)
+            return [dict(row) for row in rows]
+        if script == InstagramScraper.SCROLL_STATE_JS:
+            return [len(self.anchors) * 10, len(self.anchors)]
+        if 'scrollTo' in script:
+            if self.loaded < len(self.posts):
+                self._load()
+            return None
+        if 'readyState' in script:
+            return 'complete'
+        return None
+
+
+@pytest.fixture
+def make_scraper(monkeypatch):
+    monkeypatch.setattr(Config, 'SCROLL_WAIT_TIMEOUT', 0.3)
+
+    def make(grid):
+        scraper = InstagramScraper(debug_port=9222)
+        scraper.driver = grid
+        scraper.pacing_floor = 0
+        return scraper
+    return make
+
+
+def test_scrape_posts_has_no_duplicate_rows(make_scraper):
+    grid = FakeGrid(total=60, batch=12)
+    posts = make_scraper(grid).scrape_posts('someone', max_posts=1000)
+
+    urls = [post['post_url'] for post in posts]
+    assert len(urls) == len(set(urls)) == 60
+    assert urls[0] == 'https://www.instagram.com/p/post00000/'
+
+
+def test_scrape_hashtag_stops_at_max_posts(make_scraper):
+    grid = FakeGrid(total=500, batch=12)
+    posts = make_scraper(grid).scrape_hashtag('#fitness', max_posts=30)
+
+    assert len({post['post_url'] for post in posts}) == len(posts) == 30
+    assert all(post['hashtag'] == '#fitness' for post in posts)
+    # Stopped on the scroll that reached 30 posts instead of loading the grid
+    assert grid.loaded == 36
+
+
+@pytest.mark.parametrize('total', [120, 1200])
+def test_scroll_posts_cost_is_linear(make_scraper, total):
+    grid = FakeGrid(total=total, batch=12)
+    posts = make_scraper(grid).scroll_posts(total, lambda link: link)
+
+    assert len(posts) == total
+    # Each anchor reaches Python once: one pass per loaded batch
+    assert grid.returned == len(grid.anchors)
+    assert grid.extract_calls == -(-total // grid.batch)